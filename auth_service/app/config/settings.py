@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 class Settings(BaseSettings):
     # Database
@@ -15,6 +15,22 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 3
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 30
     
+    # Password hashing. The first scheme hashes new passwords, the others are
+    # only verified and rehashed on login, as are hashes at another cost.
+    # Tune the costs with scripts/calibrate_password_hash.py
+    PASSWORD_HASH_SCHEMES: List[str] = ["bcrypt"]  # e.g. '["argon2", "bcrypt"]', argon2 needs argon2-cffi
+    BCRYPT_ROUNDS: int = 12  # log2 of the iterations
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 19456  # KiB
+    ARGON2_PARALLELISM: int = 1
+    PASSWORD_HASH_WORKERS: int = 4  # threads per worker process
+    PASSWORD_HASH_MAX_PENDING: int = 32  # running + queued hashes before answering 503
+
+    # Revocations pushed to the time tracker on logout, signed with SECRET_KEY
+    TIME_TRACKER_URL: Optional[str] = "http://localhost:8002"  # None disables the push
+    REVOCATION_PUSH_ATTEMPTS: int = 5
+    REVOCATION_PUSH_TIMEOUT: float = 2.0  # seconds per attempt
+
     # Email
     SMTP_TLS: bool = True
     SMTP_PORT: Optional[int] = None
@@ -3,7 +3,8 @@ from app.db.crud.user import (
     get_user_by_username,
     get_user_by_email,
     get_existing_user,
-    create_user
+    create_user,
+    update_password_hash
 )
 from app.db.crud.token import (
     get_token,
@@ -18,6 +19,7 @@ __all__ = [
     "get_user_by_email",
     "get_existing_user",
     "create_user",
+    "update_password_hash",
     "get_token",
     "create_token",
     "revoke_token",
@@ -3,7 +3,7 @@ from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models.user import User
 from app.schemas.auth import UserCreate
-from app.utils.auth import get_password_hash
+from app.utils.auth import get_password_hash_async
 
 async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
     result = await db.execute(select(User).filter(User.id == user_id))
@@ -29,9 +29,14 @@ async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
     user = User(
         email=user_data.email,
         username=user_data.username,
-        hashed_password=get_password_hash(user_data.password)
+        hashed_password=await get_password_hash_async(user_data.password)
     )
     db.add(user)
     await db.commit()
     await db.refresh(user)
-    return user 
\ No newline at end of file
+    return user 
+
+async def update_password_hash(db: AsyncSession, user: User, hashed_password: str) -> User:
+    user.hashed_password = hashed_password
+    await db.commit()
+    return user
@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import auth
 from app.config.settings import settings
+from app.utils.auth import shutdown_hash_executor
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -20,3 +21,7 @@ app.add_middleware(
 
 # Include routers
 app.include_router(auth.router)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    shutdown_hash_executor()
@@ -1,17 +1,19 @@
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import User
 from app.schemas.auth import UserCreate, UserResponse, Token as TokenSchema
-from app.utils.auth import verify_password, create_token, verify_token
+from app.utils.auth import HashingOverloaded, verify_and_update_password_async, create_token, verify_token
+from app.utils.revocations import publish_revocation
 from app.db.db_vitals import get_async_db
 from app.db.crud import (
     get_user_by_id,
     get_user_by_username,
     get_existing_user,
     create_user,
+    update_password_hash,
     create_token as create_db_token,
     revoke_token,
     revoke_all_user_tokens
@@ -21,6 +23,12 @@ from app.config.settings import settings
 router = APIRouter(prefix="", tags=["auth"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+overloaded_exception = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Too many concurrent sign-ins, try again shortly",
+    headers={"Retry-After": "1"},
+)
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_async_db)
@@ -55,7 +63,10 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_d
         )
     
     # Create new user
-    user = await create_user(db, user_data)
+    try:
+        user = await create_user(db, user_data)
+    except HashingOverloaded:
+        raise overloaded_exception
     
     # TODO: Send verification email
     return user
@@ -67,13 +78,23 @@ async def login(
 ):
     # Find user
     user = await get_user_by_username(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = False, None
+    if user is not None:
+        try:
+            valid, new_hash = await verify_and_update_password_async(form_data.password, user.hashed_password)
+        except HashingOverloaded:
+            raise overloaded_exception
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Upgrade a hash of a deprecated scheme or cost while the password is at hand
+    if new_hash:
+        await update_password_hash(db, user, new_hash)
+    
     # Create tokens
     access_token = create_token(str(user.id), "access")
     refresh_token = create_token(str(user.id), "refresh")
@@ -133,11 +154,15 @@ async def refresh_token(
 
 @router.post("/logout")
 async def logout(
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_async_db)
 ):
     # Revoke all refresh tokens for user
+    revoked_before = datetime.utcnow()
     await revoke_all_user_tokens(db, current_user.id)
+    # Access tokens stay valid until they expire, other services are told to deny them
+    background_tasks.add_task(publish_revocation, current_user.id, revoked_before)
     return {"detail": "Successfully logged out"}
 
 @router.get("/me", response_model=UserResponse)
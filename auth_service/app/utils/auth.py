@@ -1,20 +1,136 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import partial
+from typing import Callable, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from passlib.registry import get_crypt_handler
 from app.config.settings import settings
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def password_cost_settings(scheme: str, **overrides) -> dict:
+    """Cost parameters of a scheme from the settings, overrides taking precedence.
+
+    The cost is pinned (min = max = default), so hashes made at any other cost
+    need an update and get rehashed on the next login.
+    """
+    if scheme == "bcrypt":
+        costs = {"rounds": settings.BCRYPT_ROUNDS}
+    elif scheme == "argon2":
+        costs = {
+            "rounds": settings.ARGON2_TIME_COST,
+            "memory_cost": settings.ARGON2_MEMORY_COST,
+            "parallelism": settings.ARGON2_PARALLELISM,
+        }
+    else:
+        costs = {}
+    costs.update(overrides)
+    if "rounds" in costs:
+        costs["min_rounds"] = costs["max_rounds"] = costs["rounds"]
+    return costs
+
+def make_password_context(schemes: list, **overrides) -> CryptContext:
+    """CryptContext hashing with schemes[0] and flagging the others as deprecated"""
+    options = {}
+    for scheme in schemes:
+        # Fail at startup, not on the first login, when a backend is missing
+        get_crypt_handler(scheme).get_backend()
+        for key, value in password_cost_settings(scheme, **overrides.get(scheme, {})).items():
+            options[f"{scheme}__{key}"] = value
+    return CryptContext(schemes=schemes, deprecated="auto", **options)
+
+pwd_context = make_password_context(settings.PASSWORD_HASH_SCHEMES)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password, returning a new hash too when the stored one uses a
+    deprecated scheme or another cost than configured"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+# A bcrypt call takes 100-300ms of CPU, on the event loop it would stall every
+# other request of the worker. bcrypt releases the GIL, so a thread pool runs
+# hashes in parallel with the loop and with each other.
+class HashingOverloaded(Exception):
+    """More password hashes are in flight than PASSWORD_HASH_MAX_PENDING allows"""
+
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hashes_in_flight = 0
+# Calls finish, and are counted out, in the pool's threads
+_hashes_lock = threading.Lock()
+
+def get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash"
+        )
+    return _hash_executor
+
+async def run_password_hashing(func: Callable, *args):
+    """Run a hashing call in the pool, refusing it when the pool is saturated.
+
+    Admission is decided up front: past PASSWORD_HASH_MAX_PENDING running and
+    queued calls, HashingOverloaded is raised at once so a login burst is shed
+    quickly instead of building a queue every caller waits through. A call
+    counts until its thread is done with it, even if the request that made
+    it is cancelled meanwhile.
+    """
+    global _hashes_in_flight
+    with _hashes_lock:
+        if _hashes_in_flight >= settings.PASSWORD_HASH_MAX_PENDING:
+            raise HashingOverloaded()
+        _hashes_in_flight += 1
+    try:
+        future = get_hash_executor().submit(partial(func, *args))
+    except BaseException:
+        _hash_done(None)
+        raise
+    future.add_done_callback(_hash_done)
+    return await asyncio.wrap_future(future)
+
+def _hash_done(future):
+    global _hashes_in_flight
+    with _hashes_lock:
+        _hashes_in_flight -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await run_password_hashing(verify_password, plain_password, hashed_password)
+
+async def verify_and_update_password_async(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return await run_password_hashing(verify_and_update_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await run_password_hashing(get_password_hash, password)
+
+def shutdown_hash_executor():
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
 # JWT token management
-def create_token(subject: str, token_type: str, expires_delta: Optional[timedelta] = None) -> str:
+def epoch_time(value: datetime) -> float:
+    """Naive UTC datetime -> seconds since the epoch, keeping the microseconds
+    so a revocation and a re-login in the same second stay ordered"""
+    return round((value - datetime(1970, 1, 1)).total_seconds(), 6)
+
+def create_token(
+    subject: str,
+    token_type: str,
+    expires_delta: Optional[timedelta] = None,
+    claims: Optional[dict] = None
+) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -27,7 +143,10 @@ def create_token(subject: str, token_type: str, expires_delta: Optional[timedelt
     to_encode = {
         "sub": str(subject),
         "exp": expire,
-        "type": token_type
+        # Other services deny tokens issued before a revocation by this
+        "iat": epoch_time(datetime.utcnow()),
+        "type": token_type,
+        **(claims or {})
     }
     
     encoded_jwt = jwt.encode(
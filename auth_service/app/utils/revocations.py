@@ -0,0 +1,48 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+
+from app.config.logger import logger
+from app.config.settings import settings
+from app.utils.auth import create_token, epoch_time
+
+REVOCATIONS_PATH = "/internal/revocations"
+
+
+def revocation_token(user_id: int, revoked_before: datetime) -> str:
+    """Short-lived token announcing that the user's tokens issued up to
+    revoked_before (naive UTC) are no longer valid"""
+    return create_token(
+        str(user_id),
+        "revocation",
+        timedelta(minutes=5),
+        {"revoked_before": epoch_time(revoked_before)}
+    )
+
+
+async def publish_revocation(user_id: int, revoked_before: datetime) -> bool:
+    """Push a revocation to the time tracker, retrying with backoff.
+
+    Run as a background task after the response: the time tracker keeps a
+    deny-list in memory, so it checks tokens without calling back here.
+    """
+    if not settings.TIME_TRACKER_URL:
+        return False
+    url = settings.TIME_TRACKER_URL.rstrip("/") + REVOCATIONS_PATH
+    payload = {"token": revocation_token(user_id, revoked_before)}
+    async with httpx.AsyncClient(timeout=settings.REVOCATION_PUSH_TIMEOUT) as client:
+        for attempt in range(settings.REVOCATION_PUSH_ATTEMPTS):
+            try:
+                response = await client.post(url, json=payload)
+                if response.status_code < 500:
+                    response.raise_for_status()
+                    return True
+            except httpx.HTTPStatusError as e:
+                logger.error(f"Revocation push for user {user_id} rejected: {e}")
+                return False
+            except httpx.HTTPError as e:
+                logger.warning(f"Revocation push for user {user_id} failed: {e!r}")
+            await asyncio.sleep(2 ** attempt * 0.5)
+    logger.error(f"Revocation push for user {user_id} gave up after {settings.REVOCATION_PUSH_ATTEMPTS} attempts")
+    return False
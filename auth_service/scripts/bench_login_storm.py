@@ -0,0 +1,104 @@
+"""Latency of `GET /me` while a storm of logins hashes passwords on the same server.
+
+Start the service, then run from the service directory:
+
+    python -m scripts.bench_login_storm --username alice --password secret
+
+The script first measures `/me` alone, then again while `--logins` clients keep
+logging in, and prints p50/p95/p99 for both phases along with how many logins
+were answered 503 by the hashing pool's admission control. With hashing on the
+event loop `/me` waits behind every bcrypt call; off the loop it should stay flat.
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def request(url: str, token: str = None, form: dict = None) -> tuple:
+    data = urllib.parse.urlencode(form).encode() if form is not None else None
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    req = urllib.request.Request(url, data=data, headers=headers)
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as response:
+            body = response.read()
+            code = response.status
+    except urllib.error.HTTPError as e:
+        body, code = e.read(), e.code
+    return time.perf_counter() - started, code, body
+
+
+def login(args) -> tuple:
+    return request(f"{args.base_url}/login", form={"username": args.username, "password": args.password})
+
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+def measure_me(args, token: str) -> list:
+    url = f"{args.base_url}/me"
+    samples = []
+    deadline = time.monotonic() + args.duration
+    while time.monotonic() < deadline:
+        samples.append(request(url, token)[0])
+        time.sleep(args.interval)
+    return samples
+
+
+def report(title: str, samples: list):
+    print(
+        f"{title:<24} n={len(samples):<6} "
+        f"p50={percentile(samples, 0.50):8.1f}ms "
+        f"p95={percentile(samples, 0.95):8.1f}ms "
+        f"p99={percentile(samples, 0.99):8.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=32, help="concurrent login clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per phase")
+    parser.add_argument("--interval", type=float, default=0.01, help="pause between /me requests")
+    args = parser.parse_args()
+
+    _, code, body = login(args)
+    if code != 200:
+        raise SystemExit(f"login failed with {code}: {body.decode()}")
+    token = json.loads(body)["access_token"]
+    report("idle", measure_me(args, token))
+
+    stop = threading.Event()
+    login_samples = []
+    codes = Counter()
+
+    def storm():
+        while not stop.is_set():
+            elapsed, code, _ = login(args)
+            codes[code] += 1
+            if code == 200:
+                login_samples.append(elapsed)
+
+    with ThreadPoolExecutor(max_workers=args.logins) as pool:
+        for _ in range(args.logins):
+            pool.submit(storm)
+        report("during login storm", measure_me(args, token))
+        stop.set()
+
+    if login_samples:
+        report("successful logins", login_samples)
+    print(f"login responses {dict(codes)}")
+
+
+if __name__ == "__main__":
+    main()
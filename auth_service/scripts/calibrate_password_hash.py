@@ -0,0 +1,72 @@
+"""Pick the password hash cost that fits a latency budget on this machine.
+
+Run from the service directory, on hardware like production's:
+
+    python -m scripts.calibrate_password_hash --scheme bcrypt --target-ms 250
+
+Each cost is timed over --samples hashes, from cheapest up until one exceeds the
+budget. The script prints every cost it tried and then the setting for the
+highest one within --target-ms. It also prints the logins per second one worker
+process can hash at that cost. For argon2 the time cost is searched at the
+configured memory cost and parallelism, or at --memory-cost. Hashes made at the
+previous cost are rehashed as their users log in.
+"""
+import argparse
+import statistics
+import time
+
+from app.config.settings import settings
+from app.utils.auth import make_password_context
+
+COSTS = {
+    "bcrypt": ("BCRYPT_ROUNDS", range(4, 20)),
+    "argon2": ("ARGON2_TIME_COST", range(1, 33)),
+}
+
+
+def time_hash(scheme: str, cost: int, samples: int, memory_cost: int = None) -> float:
+    overrides = {"rounds": cost}
+    if memory_cost:
+        overrides["memory_cost"] = memory_cost
+    context = make_password_context([scheme], **{scheme: overrides})
+    context.hash("warm up")
+    durations = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash("correct horse battery staple")
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scheme", choices=sorted(COSTS), default=settings.PASSWORD_HASH_SCHEMES[0])
+    parser.add_argument("--target-ms", type=float, default=250.0, help="latency budget per hash")
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--memory-cost", type=int, help="argon2 memory cost in KiB")
+    args = parser.parse_args()
+
+    setting, costs = COSTS[args.scheme]
+    chosen = None
+    for cost in costs:
+        elapsed = time_hash(args.scheme, cost, args.samples, args.memory_cost)
+        print(f"{setting}={cost:<4} {elapsed:9.1f}ms")
+        if elapsed > args.target_ms:
+            break
+        chosen = (cost, elapsed)
+
+    if chosen is None:
+        raise SystemExit(f"even the cheapest {args.scheme} cost exceeds {args.target_ms}ms")
+    cost, elapsed = chosen
+    print(f"\n{setting}={cost}")
+    if args.scheme == "argon2" and args.memory_cost:
+        print(f"ARGON2_MEMORY_COST={args.memory_cost}")
+    print(
+        f"# {elapsed:.1f}ms per hash, up to {settings.PASSWORD_HASH_WORKERS * 1000 / elapsed:.0f} "
+        f"logins/s per worker process with PASSWORD_HASH_WORKERS={settings.PASSWORD_HASH_WORKERS} "
+        f"if as many cores are free"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.config.settings import settings
+from app.utils import auth
+from app.utils.auth import (
+    HashingOverloaded,
+    get_password_hash,
+    get_password_hash_async,
+    make_password_context,
+    pwd_context,
+    run_password_hashing,
+    verify_and_update_password,
+    verify_password_async,
+)
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_in_pool():
+    hashed = await get_password_hash_async("correct horse")
+    assert await verify_password_async("correct horse", hashed)
+    assert not await verify_password_async("wrong horse", hashed)
+
+
+@pytest.mark.asyncio
+async def test_hashing_runs_off_the_event_loop():
+    loop_thread = threading.get_ident()
+    assert await run_password_hashing(threading.get_ident) != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_saturated_pool_refuses_new_hashes(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 1)
+    release = threading.Event()
+    blocked = asyncio.ensure_future(run_password_hashing(release.wait, 5))
+    await asyncio.sleep(0.05)
+    with pytest.raises(HashingOverloaded):
+        await get_password_hash_async("secret")
+    release.set()
+    assert await blocked
+    assert auth._hashes_in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_keeps_its_hash_counted(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 1)
+    release = threading.Event()
+    caller = asyncio.ensure_future(run_password_hashing(release.wait, 5))
+    await asyncio.sleep(0.05)
+    caller.cancel()
+    await asyncio.sleep(0.05)
+    # The thread is still hashing for the cancelled request
+    assert auth._hashes_in_flight == 1
+    with pytest.raises(HashingOverloaded):
+        await get_password_hash_async("secret")
+    release.set()
+    await asyncio.sleep(0.05)
+    assert auth._hashes_in_flight == 0
+
+
+def test_current_hash_needs_no_update():
+    hashed = get_password_hash("secret")
+    assert verify_and_update_password("secret", hashed) == (True, None)
+    assert verify_and_update_password("wrong", hashed) == (False, None)
+
+
+def test_hash_at_another_cost_is_rehashed():
+    cheap = make_password_context(["bcrypt"], bcrypt={"rounds": 4}).hash("secret")
+    valid, new_hash = verify_and_update_password("secret", cheap)
+    assert valid
+    assert pwd_context.identify(new_hash) == "bcrypt"
+    assert f"${settings.BCRYPT_ROUNDS:02d}$" in new_hash
+    assert verify_and_update_password("secret", new_hash) == (True, None)
+
+
+def test_deprecated_scheme_is_rehashed_with_the_first():
+    context = make_password_context(["bcrypt", "sha256_crypt"])
+    old_hash = make_password_context(["sha256_crypt"]).hash("secret")
+    valid, new_hash = context.verify_and_update("secret", old_hash)
+    assert valid
+    assert context.identify(new_hash) == "bcrypt"
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config.settings import settings
+from app.utils.auth import create_token, epoch_time, verify_token
+from app.utils.revocations import publish_revocation, revocation_token
+
+
+def test_tokens_carry_issued_at():
+    payload = verify_token(create_token("1", "access"))
+    assert payload["iat"] <= payload["exp"]
+
+
+def test_revocation_token_claims():
+    revoked_before = datetime(2025, 1, 1, 12, 30, 0, 250000)
+    payload = verify_token(revocation_token(7, revoked_before))
+    assert payload["type"] == "revocation"
+    assert payload["sub"] == "7"
+    assert payload["revoked_before"] == epoch_time(revoked_before)
+    assert datetime(1970, 1, 1) + timedelta(seconds=payload["revoked_before"]) == revoked_before
+
+
+def test_relogin_in_the_same_second_is_issued_after_the_revocation():
+    revoked_before = datetime.utcnow()
+    payload = verify_token(create_token("7", "access"))
+    assert payload["iat"] >= epoch_time(revoked_before)
+
+
+@pytest.mark.asyncio
+async def test_publish_is_skipped_without_time_tracker_url(monkeypatch):
+    monkeypatch.setattr(settings, "TIME_TRACKER_URL", None)
+    assert await publish_revocation(7, datetime.utcnow()) is False
@@ -13,6 +13,47 @@ class Settings(BaseSettings):
     # JWT
     SECRET_KEY: str = "your-secret-key"
     ALGORITHM: str = "HS256"
+    AUTH_CLAIMS_CACHE_SIZE: int = 10000  # verified tokens kept per worker
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 3  # as in the auth service, older revocations are moot
+
+    # Stats
+    STATS_PROCESS_POOL_WORKERS: int = 2
+    STATS_PROCESS_POOL_THRESHOLD: int = 20000  # rows; smaller inputs are aggregated inline
+    STATS_PROCESS_POOL_MAX_PENDING: int = 8
+
+    # Reports
+    REPORTS_DIR: str = "reports"
+    REPORT_QUEUE_BACKEND: str = "memory"  # memory or database
+    REPORT_WORKERS: int = 2  # per process, 0 to only submit
+    REPORT_MAX_UNFINISHED_PER_USER: int = 3
+    REPORT_POLL_INTERVAL: float = 5.0  # seconds
+    REPORT_JOB_TIMEOUT: int = 3600  # seconds before a running job counts as abandoned
+    REPORT_EXPORT_CHUNK_ROWS: int = 5000
+
+    # Deletions
+    DELETE_INLINE_MAX_ROWS: int = 5000  # larger deletions run as background jobs
+    DELETE_CHUNK_ROWS: int = 2000  # activities removed per transaction
+    DELETE_CHUNK_PAUSE: float = 0.05  # seconds between chunks
+
+    # Suggestions
+    SUGGESTIONS_HALF_LIFE_DAYS: float = 14.0  # a use counts half as much after this long
+    SUGGESTIONS_MAX_USERS: int = 1000  # per-user indexes kept in memory per worker
+    SUGGESTIONS_INDEX_TTL: int = 600  # seconds before an index is rebuilt from the database
+
+    # HTTP caching
+    ETAG_CLOCK_PERIOD: int = 60  # seconds a validator of a result counting up to now stays valid
+    DATA_VERSION_MAX_USERS: int = 100000  # per-user data versions cached per worker
+
+    # LISTEN connection of each worker (data versions, token revocations)
+    NOTIFY_PING_INTERVAL: float = 30.0  # seconds between checks of the connection
+    NOTIFY_RECONNECT_DELAY: float = 5.0
+
+    # Compression
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller bodies are sent as is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_CACHE_BYTES: int = 16 * 1024 * 1024  # compressed bodies kept per worker
 
     # General
     PROJECT_NAME: str = "Chronary Time Tracker Service"
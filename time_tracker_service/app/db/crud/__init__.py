@@ -19,15 +19,62 @@ from app.db.crud.subtags import (
     update_subtag,
     delete_subtag
 )
+from app.db.crud.user_settings import (
+    get_user_settings,
+    get_user_timezone,
+    update_user_settings
+)
+from app.db.crud.tag_metrics import (
+    recompute_tag_metrics,
+    update_tag_metrics,
+    get_tag_metrics
+)
+from app.db.crud.daily_totals import (
+    add_activity_to_daily_totals,
+    remove_activities_from_daily_totals,
+    rebuild_daily_totals,
+    get_year_totals
+)
+from app.db.crud.goals import (
+    create_goal,
+    get_goal,
+    get_user_goals,
+    update_goal,
+    delete_goal,
+    get_goals_progress
+)
+from app.db.crud.report_jobs import (
+    create_report_job,
+    get_report_job,
+    get_user_report_jobs,
+    claim_report_job,
+    finish_report_job,
+    requeue_stale_report_jobs
+)
+from app.db.crud.deletions import (
+    tag_activities,
+    tag_type_activities,
+    user_activities,
+    count_activities,
+    delete_activities_in_chunks,
+    delete_user_data
+)
 from app.db.crud.activities import (
     create_activity,
     get_activity,
     get_user_activities,
     get_activities_after,
     get_activities_in_range,
+    search_activities,
+    get_name_usage,
+    get_overlapping_activities,
     update_activity,
     close_activity,
     delete_activity,
+    get_bucketed_stats,
+    get_timeline,
+    get_hour_of_week_matrix,
+    compare_ranges,
     get_daily_stats,
     get_weekly_stats
 )
@@ -48,14 +95,49 @@ __all__ = [
     "get_tag_subtags",
     "update_subtag",
     "delete_subtag",
+    "get_user_settings",
+    "get_user_timezone",
+    "update_user_settings",
+    "recompute_tag_metrics",
+    "update_tag_metrics",
+    "get_tag_metrics",
+    "add_activity_to_daily_totals",
+    "remove_activities_from_daily_totals",
+    "rebuild_daily_totals",
+    "get_year_totals",
+    "create_goal",
+    "get_goal",
+    "get_user_goals",
+    "update_goal",
+    "delete_goal",
+    "get_goals_progress",
+    "create_report_job",
+    "get_report_job",
+    "get_user_report_jobs",
+    "claim_report_job",
+    "finish_report_job",
+    "requeue_stale_report_jobs",
+    "tag_activities",
+    "tag_type_activities",
+    "user_activities",
+    "count_activities",
+    "delete_activities_in_chunks",
+    "delete_user_data",
     "create_activity",
     "get_activity",
     "get_user_activities",
     "get_activities_after",
     "get_activities_in_range",
+    "search_activities",
+    "get_name_usage",
+    "get_overlapping_activities",
     "update_activity",
     "close_activity",
     "delete_activity",
+    "get_bucketed_stats",
+    "get_timeline",
+    "get_hour_of_week_matrix",
+    "compare_ranges",
     "get_daily_stats",
     "get_weekly_stats"
 ]
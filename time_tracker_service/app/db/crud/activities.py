@@ -1,9 +1,58 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy import select, delete, func, and_, extract
+import re
+from sqlalchemy import select, delete, func, and_, case, cast, column, values, text, true, literal_column, tuple_, Float, Integer, String, DateTime
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from app.db.models import Activity, Tag, Subtag, TagType
+from app.db.models.activities import SEARCH_DOCUMENT
 from app.schemas.activities import ActivityCreate, ActivityUpdate
+from app.utils.executor import run_cpu_bound
+from app.db.crud.user_settings import get_user_timezone
+from app.db.crud.daily_totals import add_activity_to_daily_totals
+from app.utils.stats import bucket_window, day_span, summarise_bucket_totals
+from app.utils.fields import Fields, fetch_fields, select_fields
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.timezones import local_time, naive_utc, to_local, to_utc, utc_now
+
+# 90 days of hourly slots
+MAX_TIMELINE_BUCKETS = 90 * 24
+
+# First key of the per-user advisory lock serialising strict writes
+OVERLAP_LOCK_CLASS = 7001
+
+class OverlapError(ValueError):
+    pass
+
+def activity_range(table=Activity):
+    """SQL for TIME_RANGE of table, as indexed by ix_activities_user_id_range"""
+    return func.tsrange(table.start, func.coalesce(table.end, literal_column("'infinity'::timestamp")))
+
+async def ensure_no_overlap(db: AsyncSession, db_activity: Activity) -> None:
+    """Flush db_activity and fail if it overlaps another activity of its user.
+
+    The check is one index probe in the caller's transaction. Strict writes of a
+    user take a transaction-level advisory lock first, so two of them cannot
+    both pass the check before either commits.
+    """
+    await db.execute(select(func.pg_advisory_xact_lock(OVERLAP_LOCK_CLASS, db_activity.user_id)))
+    await db.flush()
+    other = aliased(Activity)
+    conflict = await db.execute(
+        select(other.id)
+        .filter(
+            Activity.id == db_activity.id,
+            other.user_id == Activity.user_id,
+            other.id != Activity.id,
+            activity_range(other).op('&&')(activity_range(Activity))
+        )
+        .limit(1)
+    )
+    other_id = conflict.scalar_one_or_none()
+    if other_id is not None:
+        await db.rollback()
+        raise OverlapError(f"Activity overlaps activity {other_id}")
 
 async def verify_tag_and_subtag(db: AsyncSession, user_id: int, tag_id: int, subtag_id: Optional[int] = None) -> bool:
     # Verify tag exists and belongs to user
@@ -29,7 +78,7 @@ async def verify_tag_and_subtag(db: AsyncSession, user_id: int, tag_id: int, sub
     
     return True
 
-async def create_activity(db: AsyncSession, user_id: int, activity: ActivityCreate) -> Activity:
+async def create_activity(db: AsyncSession, user_id: int, activity: ActivityCreate, strict: bool = False) -> Activity:
     # Verify tag and subtag
     await verify_tag_and_subtag(db, user_id, activity.tag_id, activity.subtag_id)
 
@@ -42,6 +91,8 @@ async def create_activity(db: AsyncSession, user_id: int, activity: ActivityCrea
         start=datetime.utcnow()
     )
     db.add(db_activity)
+    if strict:
+        await ensure_no_overlap(db, db_activity)
     await db.commit()
     await db.refresh(db_activity)
     return db_activity
@@ -55,47 +106,154 @@ async def get_activity(db: AsyncSession, activity_id: int, user_id: int) -> Opti
     )
     return result.scalar_one_or_none()
 
-async def get_user_activities(db: AsyncSession, user_id: int) -> List[Activity]:
+async def get_running_activity(db: AsyncSession, user_id: int) -> Optional[Activity]:
+    """The user's latest activity that is not closed yet"""
     result = await db.execute(
         select(Activity)
-        .filter(Activity.user_id == user_id)
+        .filter(Activity.user_id == user_id, Activity.end.is_(None))
         .order_by(Activity.start.desc())
+        .limit(1)
     )
-    return list(result.scalars().all())
+    return result.scalar_one_or_none()
 
-async def get_activities_after(db: AsyncSession, user_id: int, start_time: datetime) -> List[Activity]:
+async def get_recent_activities(db: AsyncSession, user_id: int, limit: int) -> List[Activity]:
     result = await db.execute(
         select(Activity)
+        .filter(Activity.user_id == user_id)
+        .order_by(Activity.start.desc())
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+# The list queries below take fields=None for whole Activity objects, or a
+# tuple of column names to select only those (see app.utils.fields)
+
+async def get_user_activities(db: AsyncSession, user_id: int, fields: Fields = None) -> List[Activity]:
+    return await fetch_fields(
+        db,
+        select_fields(Activity, fields)
+        .filter(Activity.user_id == user_id)
+        .order_by(Activity.start.desc()),
+        fields
+    )
+
+async def get_activities_after(
+    db: AsyncSession,
+    user_id: int,
+    start_time: datetime,
+    fields: Fields = None
+) -> List[Activity]:
+    return await fetch_fields(
+        db,
+        select_fields(Activity, fields)
         .filter(
             Activity.user_id == user_id,
             Activity.start >= start_time
         )
-        .order_by(Activity.start.desc())
+        .order_by(Activity.start.desc()),
+        fields
     )
-    return list(result.scalars().all())
 
 async def get_activities_in_range(
     db: AsyncSession, 
     user_id: int, 
     start_time: datetime,
-    end_time: datetime
+    end_time: datetime,
+    fields: Fields = None
 ) -> List[Activity]:
-    result = await db.execute(
-        select(Activity)
+    return await fetch_fields(
+        db,
+        select_fields(Activity, fields)
         .filter(
             Activity.user_id == user_id,
             Activity.start >= start_time,
             Activity.start <= end_time
         )
-        .order_by(Activity.start.desc())
+        .order_by(Activity.start.desc()),
+        fields
     )
-    return list(result.scalars().all())
+
+def search_terms(query: str) -> str:
+    """tsquery text matching activities that contain every word of query, words
+    also match as prefixes so results show up while the user is typing"""
+    words = re.findall(r'\w+', query.lower())
+    if not words:
+        raise ValueError("Search query has no words")
+    return ' & '.join(f'{word}:*' for word in words)
+
+async def search_activities(
+    db: AsyncSession,
+    user_id: int,
+    query: str,
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[Tuple[Activity, float]], Optional[str]]:
+    """Activities matching query, best ranked first, and the cursor of the next page.
+
+    Matching goes through the (user_id, search document) GIN index, only the
+    matches are ranked. Pages are cut by keyset on (rank, id), so deep pages
+    cost the same as the first one.
+    """
+    tsquery = func.to_tsquery(literal_column("'simple'"), search_terms(query))
+    rank = func.ts_rank_cd(literal_column(SEARCH_DOCUMENT), tsquery).label('rank')
+    stmt = (
+        select(Activity, rank)
+        .filter(
+            Activity.user_id == user_id,
+            literal_column(SEARCH_DOCUMENT).bool_op('@@')(tsquery)
+        )
+        .order_by(rank.desc(), Activity.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        last_rank, last_id = decode_cursor(cursor, float, int)
+        stmt = stmt.filter(tuple_(rank, Activity.id) < tuple_(last_rank, last_id))
+
+    rows = [(activity, activity_rank) for activity, activity_rank in (await db.execute(stmt)).all()]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last_activity, last_rank = rows[-1]
+    return rows, encode_cursor(last_rank, last_activity.id)
+
+async def get_name_usage(db: AsyncSession, user_id: int, half_life_days: float) -> List[tuple]:
+    """(name, tag_id, subtag_id, weight, last_used) per case-insensitive activity
+    name and (tag, subtag) pair. weight counts uses halved every half_life_days
+    before last_used, name is the spelling used last"""
+    key = func.lower(Activity.name)
+    uses = (
+        select(
+            key.label('key'),
+            Activity.name,
+            Activity.tag_id,
+            Activity.subtag_id,
+            Activity.start,
+            func.max(Activity.start).over(
+                partition_by=(key, Activity.tag_id, Activity.subtag_id)
+            ).label('last_used')
+        )
+        .filter(Activity.user_id == user_id, Activity.name.isnot(None))
+        .subquery()
+    )
+    age_seconds = func.extract('epoch', uses.c.last_used - uses.c.start)
+    result = await db.execute(
+        select(
+            func.array_agg(aggregate_order_by(uses.c.name, uses.c.start.desc()))[1],
+            uses.c.tag_id,
+            uses.c.subtag_id,
+            cast(func.sum(func.power(2, -age_seconds / (half_life_days * 86400))), Float),
+            func.max(uses.c.last_used)
+        )
+        .group_by(uses.c.key, uses.c.tag_id, uses.c.subtag_id)
+    )
+    return result.all()
 
 async def update_activity(
     db: AsyncSession,
     activity_id: int,
     user_id: int,
-    activity_update: ActivityUpdate
+    activity_update: ActivityUpdate,
+    strict: bool = False
 ) -> Optional[Activity]:
     db_activity = await get_activity(db, activity_id, user_id)
     if not db_activity:
@@ -107,10 +265,30 @@ async def update_activity(
         new_subtag_id = activity_update.subtag_id if activity_update.subtag_id is not None else db_activity.subtag_id
         await verify_tag_and_subtag(db, user_id, new_tag_id, new_subtag_id)
 
+    old = (db_activity.tag_id, db_activity.start, db_activity.end)
     update_data = activity_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
+        if field in ('start', 'end') and value is not None:
+            value = naive_utc(value)
         setattr(db_activity, field, value)
 
+    if db_activity.start is None:
+        raise ValueError("start time can't be removed")
+    if db_activity.end is not None and db_activity.end <= db_activity.start:
+        raise ValueError("end time must be after start time")
+
+    if strict:
+        await ensure_no_overlap(db, db_activity)
+
+    # Minutes of closed activities move with their tag and times
+    new = (db_activity.tag_id, db_activity.start, db_activity.end)
+    if new != old:
+        timezone = await get_user_timezone(db, user_id)
+        if old[2] is not None:
+            await add_activity_to_daily_totals(db, user_id, *old, timezone, sign=-1)
+        if new[2] is not None:
+            await add_activity_to_daily_totals(db, user_id, *new, timezone)
+
     await db.commit()
     await db.refresh(db_activity)
     return db_activity
@@ -124,24 +302,146 @@ async def close_activity(db: AsyncSession, activity_id: int, user_id: int) -> Op
         raise ValueError("Activity is already closed")
 
     db_activity.end = datetime.utcnow()
+    timezone = await get_user_timezone(db, user_id)
+    await add_activity_to_daily_totals(
+        db, user_id, db_activity.tag_id, db_activity.start, db_activity.end, timezone
+    )
     await db.commit()
     await db.refresh(db_activity)
     return db_activity
 
 async def delete_activity(db: AsyncSession, activity_id: int, user_id: int) -> bool:
     result = await db.execute(
-        delete(Activity).filter(
+        delete(Activity)
+        .filter(
             Activity.id == activity_id,
             Activity.user_id == user_id
         )
+        .returning(Activity.tag_id, Activity.start, Activity.end)
     )
+    deleted = result.first()
+    if deleted is not None:
+        timezone = await get_user_timezone(db, user_id)
+        await add_activity_to_daily_totals(db, user_id, *deleted, timezone, sign=-1)
     await db.commit()
-    return result.rowcount > 0
+    return deleted is not None
 
-def calculate_duration_minutes(start: datetime, end: Optional[datetime], current_time: datetime) -> float:
-    end_time = end if end is not None else current_time
-    duration = end_time - start
-    return duration.total_seconds() / 60
+async def get_overlapping_activities(
+    db: AsyncSession,
+    user_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 100
+) -> List[dict]:
+    """Pairs of the user's activities whose time ranges overlap, optionally only
+    pairs where the first one starts in [start, end). Each activity probes
+    ix_activities_user_id_range for the later ones it overlaps"""
+    other = aliased(Activity)
+    overlap = activity_range(Activity).op('*')(activity_range(other))
+    stmt = (
+        select(
+            Activity.id,
+            other.id,
+            func.lower(overlap),
+            func.nullif(func.upper(overlap), literal_column("'infinity'::timestamp"))
+        )
+        .filter(
+            Activity.user_id == user_id,
+            other.user_id == user_id,
+            other.id > Activity.id,
+            activity_range(other).op('&&')(activity_range(Activity))
+        )
+        .order_by(Activity.start, Activity.id, other.id)
+        .limit(limit)
+    )
+    if start is not None:
+        stmt = stmt.filter(Activity.start >= start)
+    if end is not None:
+        stmt = stmt.filter(Activity.start < end)
+
+    result = await db.execute(stmt)
+    return [
+        {
+            'activity_id': activity_id,
+            'other_activity_id': other_id,
+            'overlap_start': overlap_start,
+            'overlap_end': overlap_end,
+        }
+        for activity_id, other_id, overlap_start, overlap_end in result.all()
+    ]
+
+def activity_minutes():
+    """SQL for an activity's duration in minutes, open activities count up to now"""
+    return cast(
+        func.extract('epoch', func.coalesce(Activity.end, utc_now()) - Activity.start) / 60,
+        Float
+    )
+
+async def get_bucketed_stats(
+    db: AsyncSession,
+    user_id: int,
+    start_time: datetime,
+    end_time: datetime,
+    granularities: List[str]
+) -> dict:
+    # Buckets are cut in the user's time zone, each granularity covers whole buckets
+    timezone = await get_user_timezone(db, user_id)
+    local_start = to_local(start_time, timezone)
+    local_end = to_local(end_time, timezone)
+    windows = [bucket_window(granularity, local_start, local_end) for granularity in granularities]
+
+    buckets = values(
+        column('idx', Integer),
+        column('unit', String),
+        column('days', Integer),
+        column('low', DateTime),
+        column('high', DateTime),
+        name='buckets'
+    ).data([
+        (index, 'day' if day_span(granularity) else granularity, day_span(granularity) or 0, low, high)
+        for index, (granularity, (low, high)) in enumerate(zip(granularities, windows))
+    ])
+
+    # One grouped scan serves every granularity: each activity joins the
+    # granularities whose window its local start falls in
+    local_activity_start = local_time(Activity.start, timezone)
+    bucket = case(
+        (buckets.c.days == 0, func.date_trunc(buckets.c.unit, local_activity_start)),
+        else_=func.date_bin(func.make_interval(0, 0, 0, buckets.c.days), local_activity_start, buckets.c.low)
+    )
+    # Coarse UTC bounds keep the (user_id, start) index usable, the exact cut
+    # happens in local time in the join condition
+    fetch_start = to_utc(min(low for low, _ in windows), timezone) - timedelta(days=1)
+    fetch_end = to_utc(max(high for _, high in windows), timezone) + timedelta(days=1)
+
+    result = await db.execute(
+        select(
+            buckets.c.idx,
+            bucket.label('bucket'),
+            Activity.tag_id,
+            Tag.name,
+            Tag.tag_type,
+            TagType.name,
+            Activity.subtag_id,
+            Subtag.name,
+            func.sum(activity_minutes())
+        )
+        .select_from(Activity)
+        .join(buckets, and_(local_activity_start >= buckets.c.low, local_activity_start < buckets.c.high))
+        .join(Tag, Activity.tag_id == Tag.id)
+        .outerjoin(Subtag, Activity.subtag_id == Subtag.id)
+        .outerjoin(TagType, Tag.tag_type == TagType.id)
+        .filter(
+            Activity.user_id == user_id,
+            Activity.start >= fetch_start,
+            Activity.start < fetch_end
+        )
+        .group_by('idx', 'bucket', Activity.tag_id, Activity.subtag_id, Tag.id, Subtag.id, TagType.id)
+    )
+    rows = [tuple(row) for row in result.all()]
+
+    stats = await run_cpu_bound(summarise_bucket_totals, rows, len(granularities), size=len(rows))
+    return dict(zip(granularities, stats))
 
 async def get_daily_stats(
     db: AsyncSession,
@@ -149,112 +449,8 @@ async def get_daily_stats(
     start_time: datetime,
     end_time: datetime
 ) -> dict:
-    # Get all relevant activities
-    activities = await get_activities_in_range(db, user_id, start_time, end_time)
-    current_time = datetime.utcnow()
-    
-    # Group activities by date and tag/subtag/tag_type
-    daily_stats = {}
-    for activity in activities:
-        date = activity.start.date()
-        if date not in daily_stats:
-            daily_stats[date] = {
-                'tags': {},
-                'subtags': {},
-                'tag_types': {}
-            }
-        
-        duration = calculate_duration_minutes(activity.start, activity.end, current_time)
-        
-        # Aggregate by tag
-        if activity.tag_id not in daily_stats[date]['tags']:
-            daily_stats[date]['tags'][activity.tag_id] = {
-                'duration': 0,
-                'name': activity.tag.name
-            }
-        daily_stats[date]['tags'][activity.tag_id]['duration'] += duration
-        
-        # Aggregate by subtag if exists
-        if activity.subtag_id:
-            if activity.subtag_id not in daily_stats[date]['subtags']:
-                daily_stats[date]['subtags'][activity.subtag_id] = {
-                    'duration': 0,
-                    'name': activity.subtag.name,
-                    'tag_id': activity.tag_id
-                }
-            daily_stats[date]['subtags'][activity.subtag_id]['duration'] += duration
-        
-        # Aggregate by tag type if exists
-        if activity.tag.tag_type:
-            if activity.tag.tag_type not in daily_stats[date]['tag_types']:
-                daily_stats[date]['tag_types'][activity.tag.tag_type] = {
-                    'duration': 0,
-                    'name': activity.tag.tag_type_rel.name
-                }
-            daily_stats[date]['tag_types'][activity.tag.tag_type]['duration'] += duration
-    
-    # Calculate averages
-    result = {
-        'by_tags': [],
-        'by_subtags': [],
-        'by_tag_types': []
-    }
-    
-    # Process tags
-    tag_totals = {}
-    for date_stats in daily_stats.values():
-        for tag_id, tag_data in date_stats['tags'].items():
-            if tag_id not in tag_totals:
-                tag_totals[tag_id] = {'total': 0, 'days': 0, 'name': tag_data['name']}
-            tag_totals[tag_id]['total'] += tag_data['duration']
-            tag_totals[tag_id]['days'] += 1
-    
-    for tag_id, data in tag_totals.items():
-        result['by_tags'].append({
-            'tag_id': tag_id,
-            'tag_name': data['name'],
-            'average_duration_minutes': data['total'] / data['days']
-        })
-    
-    # Process subtags
-    subtag_totals = {}
-    for date_stats in daily_stats.values():
-        for subtag_id, subtag_data in date_stats['subtags'].items():
-            if subtag_id not in subtag_totals:
-                subtag_totals[subtag_id] = {
-                    'total': 0, 
-                    'days': 0, 
-                    'name': subtag_data['name'],
-                    'tag_id': subtag_data['tag_id']
-                }
-            subtag_totals[subtag_id]['total'] += subtag_data['duration']
-            subtag_totals[subtag_id]['days'] += 1
-    
-    for subtag_id, data in subtag_totals.items():
-        result['by_subtags'].append({
-            'subtag_id': subtag_id,
-            'subtag_name': data['name'],
-            'tag_id': data['tag_id'],
-            'average_duration_minutes': data['total'] / data['days']
-        })
-    
-    # Process tag types
-    tag_type_totals = {}
-    for date_stats in daily_stats.values():
-        for tag_type_id, tag_type_data in date_stats['tag_types'].items():
-            if tag_type_id not in tag_type_totals:
-                tag_type_totals[tag_type_id] = {'total': 0, 'days': 0, 'name': tag_type_data['name']}
-            tag_type_totals[tag_type_id]['total'] += tag_type_data['duration']
-            tag_type_totals[tag_type_id]['days'] += 1
-    
-    for tag_type_id, data in tag_type_totals.items():
-        result['by_tag_types'].append({
-            'tag_type_id': tag_type_id,
-            'tag_type_name': data['name'],
-            'average_duration_minutes': data['total'] / data['days']
-        })
-    
-    return result
+    stats = await get_bucketed_stats(db, user_id, start_time, end_time, ['day'])
+    return stats['day']
 
 async def get_weekly_stats(
     db: AsyncSession,
@@ -262,124 +458,236 @@ async def get_weekly_stats(
     start_time: datetime,
     end_time: datetime
 ) -> dict:
-    # Adjust start_time to Monday of its week
-    start_week = start_time - timedelta(days=start_time.weekday())
-    start_week = start_week.replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    # Adjust end_time to Sunday of its week
-    days_to_sunday = 6 - end_time.weekday()
-    end_week = end_time + timedelta(days=days_to_sunday)
-    end_week = end_week.replace(hour=23, minute=59, second=59, microsecond=999999)
-    
-    if start_week >= end_week:
-        raise ValueError("The time range must include at least one full week (Monday to Sunday)")
-    
-    # Get all activities for the adjusted time range
-    activities = await get_activities_in_range(db, user_id, start_week, end_week)
-    current_time = datetime.utcnow()
-    
-    # Group activities by week and tag/subtag/tag_type
-    weekly_stats = {}
-    for activity in activities:
-        # Calculate the Monday of the activity's week
-        week_start = activity.start - timedelta(days=activity.start.weekday())
-        week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        if week_start not in weekly_stats:
-            weekly_stats[week_start] = {
-                'tags': {},
-                'subtags': {},
-                'tag_types': {}
-            }
-        
-        duration = calculate_duration_minutes(activity.start, activity.end, current_time)
-        
-        # Aggregate by tag
-        if activity.tag_id not in weekly_stats[week_start]['tags']:
-            weekly_stats[week_start]['tags'][activity.tag_id] = {
-                'duration': 0,
-                'name': activity.tag.name
-            }
-        weekly_stats[week_start]['tags'][activity.tag_id]['duration'] += duration
-        
-        # Aggregate by subtag if exists
-        if activity.subtag_id:
-            if activity.subtag_id not in weekly_stats[week_start]['subtags']:
-                weekly_stats[week_start]['subtags'][activity.subtag_id] = {
-                    'duration': 0,
-                    'name': activity.subtag.name,
-                    'tag_id': activity.tag_id
-                }
-            weekly_stats[week_start]['subtags'][activity.subtag_id]['duration'] += duration
-        
-        # Aggregate by tag type if exists
-        if activity.tag.tag_type:
-            if activity.tag.tag_type not in weekly_stats[week_start]['tag_types']:
-                weekly_stats[week_start]['tag_types'][activity.tag.tag_type] = {
-                    'duration': 0,
-                    'name': activity.tag.tag_type_rel.name
-                }
-            weekly_stats[week_start]['tag_types'][activity.tag.tag_type]['duration'] += duration
-    
-    # Calculate averages
-    result = {
-        'by_tags': [],
-        'by_subtags': [],
-        'by_tag_types': []
+    stats = await get_bucketed_stats(db, user_id, start_time, end_time, ['week'])
+    return stats['week']
+
+TIMELINE_QUERY = text("""
+    WITH slots AS (
+        SELECT slot,
+               timezone('UTC', timezone(CAST(:timezone AS text), slot)) AS slot_start,
+               timezone('UTC', timezone(CAST(:timezone AS text), slot + make_interval(mins => :bucket_minutes))) AS slot_end
+        FROM generate_series(
+            CAST(:window_start AS timestamp),
+            CAST(:window_end AS timestamp) - make_interval(mins => :bucket_minutes),
+            make_interval(mins => :bucket_minutes)
+        ) AS slot
+    ),
+    spans AS (
+        SELECT tag_id, start, coalesce("end", timezone('UTC', now())) AS "end"
+        FROM activities
+        WHERE user_id = :user_id
+          AND start < CAST(:utc_end AS timestamp)
+          AND coalesce("end", timezone('UTC', now())) > CAST(:utc_start AS timestamp)
+    ),
+    totals AS (
+        SELECT spans.tag_id, slots.slot,
+               sum(extract(epoch FROM least(spans."end", slots.slot_end) - greatest(spans.start, slots.slot_start))) / 60 AS minutes
+        FROM spans
+        JOIN slots ON spans.start < slots.slot_end AND spans."end" > slots.slot_start
+        GROUP BY spans.tag_id, slots.slot
+    )
+    SELECT tag_ids.tag_id,
+           array_agg(CAST(round(coalesce(totals.minutes, 0)) AS integer) ORDER BY slots.slot) AS minutes
+    FROM (SELECT DISTINCT tag_id FROM totals) AS tag_ids
+    CROSS JOIN slots
+    LEFT JOIN totals ON totals.tag_id = tag_ids.tag_id AND totals.slot = slots.slot
+    GROUP BY tag_ids.tag_id
+    ORDER BY tag_ids.tag_id
+""")
+
+async def get_timeline(
+    db: AsyncSession,
+    user_id: int,
+    end_time: datetime,
+    days: int,
+    bucket_minutes: int = 60
+) -> dict:
+    if bucket_minutes <= 0 or (24 * 60) % bucket_minutes:
+        raise ValueError("bucket_minutes must evenly divide a day")
+    bucket_count = days * 24 * 60 // bucket_minutes
+    if bucket_count > MAX_TIMELINE_BUCKETS:
+        raise ValueError(f"A timeline can have at most {MAX_TIMELINE_BUCKETS} buckets")
+
+    # Slots are cut on the user's wall clock, ending with the slot end_time falls in
+    timezone = await get_user_timezone(db, user_id)
+    local_end = to_local(end_time, timezone)
+    local_end = local_end.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(
+        minutes=((local_end.hour * 60 + local_end.minute) // bucket_minutes + 1) * bucket_minutes
+    )
+    local_start = local_end - timedelta(minutes=bucket_count * bucket_minutes)
+
+    result = await db.execute(
+        TIMELINE_QUERY,
+        {
+            'user_id': user_id,
+            'timezone': timezone,
+            'bucket_minutes': bucket_minutes,
+            'window_start': local_start,
+            'window_end': local_end,
+            'utc_start': to_utc(local_start, timezone),
+            'utc_end': to_utc(local_end, timezone),
+        }
+    )
+    return {
+        'start': local_start,
+        'timezone': timezone,
+        'bucket_minutes': bucket_minutes,
+        'buckets': bucket_count,
+        'series': [
+            {'tag_id': tag_id, 'minutes': minutes}
+            for tag_id, minutes in result.all()
+        ]
     }
-    
-    # Process tags
-    tag_totals = {}
-    for week_stats in weekly_stats.values():
-        for tag_id, tag_data in week_stats['tags'].items():
-            if tag_id not in tag_totals:
-                tag_totals[tag_id] = {'total': 0, 'weeks': 0, 'name': tag_data['name']}
-            tag_totals[tag_id]['total'] += tag_data['duration']
-            tag_totals[tag_id]['weeks'] += 1
-    
-    for tag_id, data in tag_totals.items():
-        result['by_tags'].append({
-            'tag_id': tag_id,
-            'tag_name': data['name'],
-            'average_duration_minutes': data['total'] / data['weeks']
-        })
-    
-    # Process subtags
-    subtag_totals = {}
-    for week_stats in weekly_stats.values():
-        for subtag_id, subtag_data in week_stats['subtags'].items():
-            if subtag_id not in subtag_totals:
-                subtag_totals[subtag_id] = {
-                    'total': 0, 
-                    'weeks': 0, 
-                    'name': subtag_data['name'],
-                    'tag_id': subtag_data['tag_id']
-                }
-            subtag_totals[subtag_id]['total'] += subtag_data['duration']
-            subtag_totals[subtag_id]['weeks'] += 1
-    
-    for subtag_id, data in subtag_totals.items():
-        result['by_subtags'].append({
-            'subtag_id': subtag_id,
-            'subtag_name': data['name'],
-            'tag_id': data['tag_id'],
-            'average_duration_minutes': data['total'] / data['weeks']
-        })
-    
-    # Process tag types
-    tag_type_totals = {}
-    for week_stats in weekly_stats.values():
-        for tag_type_id, tag_type_data in week_stats['tag_types'].items():
-            if tag_type_id not in tag_type_totals:
-                tag_type_totals[tag_type_id] = {'total': 0, 'weeks': 0, 'name': tag_type_data['name']}
-            tag_type_totals[tag_type_id]['total'] += tag_type_data['duration']
-            tag_type_totals[tag_type_id]['weeks'] += 1
-    
-    for tag_type_id, data in tag_type_totals.items():
-        result['by_tag_types'].append({
-            'tag_type_id': tag_type_id,
-            'tag_type_name': data['name'],
-            'average_duration_minutes': data['total'] / data['weeks']
+
+HOUR_OF_WEEK_QUERY = text("""
+    WITH spans AS (
+        SELECT tag_id,
+               greatest(start, CAST(:utc_start AS timestamp)) AS start,
+               least(coalesce("end", timezone('UTC', now())), CAST(:utc_end AS timestamp)) AS "end"
+        FROM activities
+        WHERE user_id = :user_id
+          AND start < CAST(:utc_end AS timestamp)
+          AND coalesce("end", timezone('UTC', now())) > CAST(:utc_start AS timestamp)
+    ),
+    hours AS (
+        SELECT spans.tag_id, slots.slot,
+               extract(epoch FROM
+                   least(spans."end", timezone('UTC', timezone(CAST(:timezone AS text), slots.slot + interval '1 hour')))
+                   - greatest(spans.start, timezone('UTC', timezone(CAST(:timezone AS text), slots.slot)))
+               ) / 60 AS minutes
+        FROM spans
+        CROSS JOIN LATERAL generate_series(
+            date_trunc('hour', timezone(CAST(:timezone AS text), timezone('UTC', spans.start))),
+            timezone(CAST(:timezone AS text), timezone('UTC', spans."end")),
+            interval '1 hour'
+        ) AS slots(slot)
+    )
+    SELECT tag_id,
+           CAST(extract(isodow FROM slot) AS integer) - 1 AS weekday,
+           CAST(extract(hour FROM slot) AS integer) AS hour,
+           sum(minutes) AS minutes
+    FROM hours
+    WHERE minutes > 0
+    GROUP BY tag_id, weekday, hour
+""")
+
+async def get_hour_of_week_matrix(
+    db: AsyncSession,
+    user_id: int,
+    start_time: datetime,
+    end_time: datetime
+) -> dict:
+    """Minutes per tag, local weekday (Monday first) and local hour.
+
+    Activities are clipped to the range and split at hour boundaries in SQL, so
+    only the grouped 7x24 cells per tag reach Python.
+    """
+    timezone = await get_user_timezone(db, user_id)
+    result = await db.execute(
+        HOUR_OF_WEEK_QUERY,
+        {
+            'user_id': user_id,
+            'timezone': timezone,
+            'utc_start': start_time,
+            'utc_end': end_time,
+        }
+    )
+
+    matrices = {}
+    for tag_id, weekday, hour, minutes in result.all():
+        matrix = matrices.setdefault(tag_id, [[0] * 24 for _ in range(7)])
+        matrix[weekday][hour] = round(minutes)
+    return {
+        'timezone': timezone,
+        'tags': [
+            {'tag_id': tag_id, 'minutes': matrix}
+            for tag_id, matrix in sorted(matrices.items())
+        ]
+    }
+
+COMPARE_GROUPS = {
+    'tag': (Activity.tag_id, Tag),
+    'subtag': (Activity.subtag_id, Subtag),
+    'tag_type': (Tag.tag_type, TagType),
+}
+
+async def compare_ranges(
+    db: AsyncSession,
+    user_id: int,
+    ranges: List[Tuple[datetime, datetime]],
+    group_by: str = 'tag',
+    top_n: int = 5
+) -> List[dict]:
+    """Top-N tags, subtags or tag types of several ranges with deltas to the previous range.
+
+    All ranges are aggregated by one grouped query over their union, window
+    functions rank the groups within each range and look up the same group in the
+    range listed before it. Activities count towards the range their start falls in.
+    """
+    key_column, name_model = COMPARE_GROUPS[group_by]
+    range_values = values(
+        column('idx', Integer),
+        column('low', DateTime),
+        column('high', DateTime),
+        name='ranges'
+    ).data([(index, low, high) for index, (low, high) in enumerate(ranges)])
+
+    totals = (
+        select(
+            range_values.c.idx,
+            key_column.label('key'),
+            func.sum(activity_minutes()).label('minutes')
+        )
+        .select_from(Activity)
+        .join(range_values, and_(Activity.start >= range_values.c.low, Activity.start < range_values.c.high))
+        .join(Tag, Activity.tag_id == Tag.id)
+        .filter(
+            Activity.user_id == user_id,
+            Activity.start >= min(low for low, _ in ranges),
+            Activity.start < max(high for _, high in ranges),
+            key_column.is_not(None)
+        )
+        .group_by(range_values.c.idx, key_column)
+        .cte('totals')
+    )
+    keys = select(totals.c.key).distinct().subquery('keys')
+
+    # Every (range, key) pair, so lag() sees zero instead of skipping a range
+    minutes = func.coalesce(totals.c.minutes, 0)
+    grid = (
+        select(
+            range_values.c.idx,
+            keys.c.key,
+            minutes.label('minutes'),
+            func.lag(minutes).over(partition_by=keys.c.key, order_by=range_values.c.idx).label('previous'),
+            func.rank().over(partition_by=range_values.c.idx, order_by=minutes.desc()).label('rank'),
+            func.sum(minutes).over(partition_by=range_values.c.idx).label('range_total')
+        )
+        .select_from(range_values)
+        .join(keys, true())
+        .outerjoin(totals, and_(totals.c.idx == range_values.c.idx, totals.c.key == keys.c.key))
+        .subquery('grid')
+    )
+    result = await db.execute(
+        select(grid, name_model.name)
+        .join(name_model, name_model.id == grid.c.key)
+        .filter(grid.c.rank <= top_n, grid.c.minutes > 0)
+        .order_by(grid.c.idx, grid.c.rank, grid.c.key)
+    )
+
+    comparisons = [
+        {'start': low, 'end': high, 'total_minutes': 0.0, 'items': []}
+        for low, high in ranges
+    ]
+    for index, key, range_minutes, previous, rank, range_total, name in result.all():
+        comparison = comparisons[index]
+        comparison['total_minutes'] = range_total
+        comparison['items'].append({
+            'id': key,
+            'name': name,
+            'minutes': range_minutes,
+            'rank': rank,
+            'previous_minutes': previous,
+            'delta_minutes': range_minutes - previous if previous is not None else None,
         })
-    
-    return result 
\ No newline at end of file
+    return comparisons
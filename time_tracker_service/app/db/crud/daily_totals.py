@@ -0,0 +1,186 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import select, delete, func, text, case, cast, union_all, Float
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import Activity, DailyTotal
+from app.db.crud.tag_metrics import update_tag_metrics, recompute_tag_metrics
+from app.utils.timezones import split_by_local_day, to_utc, utc_now
+
+# Recomputes the rollup of one user (or of everyone when :user_id is NULL) from
+# activities, splitting each closed activity across the local days it covers
+REBUILD_DAILY_TOTALS = """
+    INSERT INTO daily_totals (user_id, day, tag_id, minutes)
+    SELECT user_id, day, tag_id, minutes
+    FROM (
+        SELECT a.user_id, CAST(d.day AS date) AS day, a.tag_id,
+               sum(extract(epoch FROM
+                   least(a."end", timezone('UTC', timezone(s.tz, d.day + interval '1 day')))
+                   - greatest(a.start, timezone('UTC', timezone(s.tz, d.day)))
+               )) / 60 AS minutes
+        FROM activities AS a
+        CROSS JOIN LATERAL (
+            SELECT coalesce(
+                (SELECT timezone FROM user_settings WHERE user_settings.user_id = a.user_id), 'UTC'
+            ) AS tz
+        ) AS s
+        CROSS JOIN LATERAL generate_series(
+            date_trunc('day', timezone(s.tz, timezone('UTC', a.start))),
+            timezone(s.tz, timezone('UTC', a."end")),
+            interval '1 day'
+        ) AS d(day)
+        WHERE a."end" IS NOT NULL AND a.tag_id IS NOT NULL
+          AND (CAST(:user_id AS integer) IS NULL OR a.user_id = :user_id)
+        GROUP BY a.user_id, d.day, a.tag_id
+    ) AS totals
+    WHERE minutes > 0
+"""
+
+async def add_activity_to_daily_totals(
+    db: AsyncSession,
+    user_id: int,
+    tag_id: int,
+    start: datetime,
+    end: Optional[datetime],
+    timezone: str,
+    sign: int = 1
+) -> None:
+    """Add (sign=1) or remove (sign=-1) a closed activity's minutes, the caller commits"""
+    if end is None or tag_id is None:
+        return
+    minutes = split_by_local_day(start, end, timezone)
+    if not minutes:
+        return
+
+    stmt = insert(DailyTotal).values([
+        {'user_id': user_id, 'day': day, 'tag_id': tag_id, 'minutes': sign * day_minutes}
+        for day, day_minutes in minutes.items()
+    ])
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[DailyTotal.user_id, DailyTotal.day, DailyTotal.tag_id],
+            set_={'minutes': DailyTotal.minutes + stmt.excluded.minutes}
+        )
+    )
+    if sign < 0:
+        # Drop rows that only held this activity, allowing for float drift
+        await db.execute(
+            delete(DailyTotal).filter(
+                DailyTotal.user_id == user_id,
+                DailyTotal.tag_id == tag_id,
+                DailyTotal.day.in_(list(minutes)),
+                DailyTotal.minutes < 1e-6
+            )
+        )
+    await update_tag_metrics(db, user_id, tag_id, list(minutes), added=sign > 0)
+
+async def remove_activities_from_daily_totals(
+    db: AsyncSession,
+    user_id: int,
+    activities: List[tuple],
+    timezone: str
+) -> None:
+    """Subtract many (tag_id, start, end) activities at once, one upsert for all
+    of them and one metrics recompute per tag. The caller commits"""
+    minutes = {}
+    for tag_id, start, end in activities:
+        if end is None or tag_id is None:
+            continue
+        for day, day_minutes in split_by_local_day(start, end, timezone).items():
+            minutes[tag_id, day] = minutes.get((tag_id, day), 0) + day_minutes
+    if not minutes:
+        return
+
+    stmt = insert(DailyTotal).values([
+        {'user_id': user_id, 'day': day, 'tag_id': tag_id, 'minutes': -day_minutes}
+        for (tag_id, day), day_minutes in minutes.items()
+    ])
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[DailyTotal.user_id, DailyTotal.day, DailyTotal.tag_id],
+            set_={'minutes': DailyTotal.minutes + stmt.excluded.minutes}
+        )
+    )
+    tag_ids = {tag_id for tag_id, _ in minutes}
+    await db.execute(
+        delete(DailyTotal).filter(
+            DailyTotal.user_id == user_id,
+            DailyTotal.tag_id.in_(tag_ids),
+            DailyTotal.minutes < 1e-6
+        )
+    )
+    for tag_id in tag_ids:
+        await recompute_tag_metrics(db, user_id, tag_id)
+
+async def rebuild_daily_totals(db: AsyncSession, user_id: int) -> None:
+    """Recompute a user's rollup from scratch, e.g. after a time zone change. The caller commits"""
+    await db.execute(delete(DailyTotal).filter(DailyTotal.user_id == user_id))
+    await db.execute(text(REBUILD_DAILY_TOTALS), {'user_id': user_id})
+    await recompute_tag_metrics(db, user_id)
+
+async def get_year_totals(db: AsyncSession, user_id: int, year: int) -> List[int]:
+    """Rounded minutes per day of the year, one entry per day"""
+    first_day = date(year, 1, 1)
+    last_day = date(year, 12, 31)
+    result = await db.execute(
+        select(DailyTotal.day, func.sum(DailyTotal.minutes))
+        .filter(
+            DailyTotal.user_id == user_id,
+            DailyTotal.day >= first_day,
+            DailyTotal.day <= last_day
+        )
+        .group_by(DailyTotal.day)
+    )
+    minutes = [0] * ((last_day - first_day).days + 1)
+    for day, day_minutes in result.all():
+        minutes[(day - first_day).days] = round(day_minutes)
+    return minutes
+
+def _open_minutes_since(since: datetime):
+    """SQL for the minutes an open activity has run since the UTC time since"""
+    return cast(func.extract('epoch', utc_now() - func.greatest(Activity.start, since)) / 60, Float)
+
+def period_contributions(user_id: int, today: date, week_start: date, timezone: str):
+    """Subquery of (tag_id, day_minutes, week_minutes) contributions to the local
+    day today and the week from week_start: the week's daily_totals rows plus
+    the activity still running. Sum them per tag for the current totals."""
+    day_start_utc = to_utc(datetime.combine(today, datetime.min.time()), timezone)
+    week_start_utc = to_utc(datetime.combine(week_start, datetime.min.time()), timezone)
+    return union_all(
+        select(
+            DailyTotal.tag_id,
+            case((DailyTotal.day == today, DailyTotal.minutes), else_=0).label('day_minutes'),
+            DailyTotal.minutes.label('week_minutes')
+        ).filter(
+            DailyTotal.user_id == user_id,
+            DailyTotal.day >= week_start,
+            DailyTotal.day <= today
+        ),
+        # Open activities are not rolled up until they are closed
+        select(
+            Activity.tag_id,
+            _open_minutes_since(day_start_utc),
+            _open_minutes_since(week_start_utc)
+        ).filter(
+            Activity.user_id == user_id,
+            Activity.end.is_(None)
+        )
+    ).subquery('contributions')
+
+async def get_period_totals(db: AsyncSession, user_id: int, today: date, timezone: str) -> List[dict]:
+    """Minutes per tag in the local day today and in its week, which starts on Monday"""
+    week_start = today - timedelta(days=today.weekday())
+    contributions = period_contributions(user_id, today, week_start, timezone)
+    result = await db.execute(
+        select(
+            contributions.c.tag_id,
+            func.sum(contributions.c.day_minutes),
+            func.sum(contributions.c.week_minutes)
+        )
+        .group_by(contributions.c.tag_id)
+        .order_by(func.sum(contributions.c.week_minutes).desc())
+    )
+    return [
+        {'tag_id': tag_id, 'today_minutes': max(float(day), 0), 'week_minutes': max(float(week), 0)}
+        for tag_id, day, week in result.all()
+    ]
@@ -0,0 +1,10 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import UserDataVersion
+
+async def get_data_version(db: AsyncSession, user_id: int) -> int:
+    """Current version of the user's data, 0 for users who never wrote anything"""
+    result = await db.execute(
+        select(UserDataVersion.version).filter(UserDataVersion.user_id == user_id)
+    )
+    return result.scalar_one_or_none() or 0
@@ -0,0 +1,69 @@
+import asyncio
+import os
+from sqlalchemy import select, delete, update, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import Activity, Tag, TagType, Goal, UserSettings, DailyTotal, TagMetrics, ReportJob
+
+def tag_activities(user_id: int, tag_id: int):
+    return and_(Activity.user_id == user_id, Activity.tag_id == tag_id)
+
+def tag_type_activities(user_id: int, tag_type_id: int):
+    return and_(
+        Activity.user_id == user_id,
+        Activity.tag_id.in_(
+            select(Tag.id).filter(Tag.tag_type == tag_type_id, Tag.user_id == user_id)
+        )
+    )
+
+def user_activities(user_id: int):
+    return Activity.user_id == user_id
+
+async def count_activities(db: AsyncSession, condition) -> int:
+    result = await db.execute(select(func.count()).select_from(Activity).filter(condition))
+    return result.scalar_one()
+
+async def delete_activities_in_chunks(
+    db: AsyncSession,
+    job_id: int,
+    condition,
+    chunk_rows: int,
+    pause: float
+) -> int:
+    """Delete activities matching condition, chunk_rows per transaction.
+
+    Each chunk commits with the job's progress, so row locks on activities are
+    held for one chunk only and other writers get in between chunks.
+    """
+    deleted = 0
+    while True:
+        result = await db.execute(
+            delete(Activity).where(
+                Activity.id.in_(select(Activity.id).filter(condition).limit(chunk_rows))
+            )
+        )
+        await db.execute(
+            update(ReportJob)
+            .where(ReportJob.id == job_id)
+            .values(progress=ReportJob.progress + result.rowcount)
+        )
+        await db.commit()
+        deleted += result.rowcount
+        if result.rowcount < chunk_rows:
+            return deleted
+        await asyncio.sleep(pause)
+
+async def delete_user_data(db: AsyncSession, user_id: int, keep_job_id: int) -> None:
+    """Everything the user owns apart from activities, which are deleted in
+    chunks beforehand, and the job doing the deletion"""
+    # Tags and tag types cascade to subtags, rollups, metrics and goals
+    for model in (Tag, TagType, Goal, DailyTotal, TagMetrics, UserSettings):
+        await db.execute(delete(model).filter(model.user_id == user_id))
+    result = await db.execute(
+        delete(ReportJob)
+        .filter(ReportJob.user_id == user_id, ReportJob.id != keep_job_id)
+        .returning(ReportJob.result_path)
+    )
+    await db.commit()
+    for (path,) in result.all():
+        if path and os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import select, delete, func, case, literal, or_, Float
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import Goal, Tag, TagType
+from app.db.crud.daily_totals import period_contributions
+from app.schemas.goals import GoalCreate, GoalUpdate
+
+async def create_goal(db: AsyncSession, user_id: int, goal: GoalCreate) -> Goal:
+    # Verify the tag or tag type exists and belongs to user
+    if goal.tag_id is not None:
+        target = await db.execute(
+            select(Tag.id).filter(Tag.id == goal.tag_id, Tag.user_id == user_id)
+        )
+        if target.scalar_one_or_none() is None:
+            raise ValueError("Tag not found or doesn't belong to user")
+    else:
+        target = await db.execute(
+            select(TagType.id).filter(TagType.id == goal.tag_type_id, TagType.user_id == user_id)
+        )
+        if target.scalar_one_or_none() is None:
+            raise ValueError("Tag type not found or doesn't belong to user")
+
+    db_goal = Goal(user_id=user_id, **goal.model_dump())
+    db.add(db_goal)
+    await db.commit()
+    await db.refresh(db_goal)
+    return db_goal
+
+async def get_goal(db: AsyncSession, goal_id: int, user_id: int) -> Optional[Goal]:
+    result = await db.execute(
+        select(Goal).filter(
+            Goal.id == goal_id,
+            Goal.user_id == user_id
+        )
+    )
+    return result.scalar_one_or_none()
+
+async def get_user_goals(db: AsyncSession, user_id: int) -> List[Goal]:
+    result = await db.execute(
+        select(Goal).filter(Goal.user_id == user_id).order_by(Goal.id)
+    )
+    return list(result.scalars().all())
+
+async def update_goal(
+    db: AsyncSession,
+    goal_id: int,
+    user_id: int,
+    goal_update: GoalUpdate
+) -> Optional[Goal]:
+    db_goal = await get_goal(db, goal_id, user_id)
+    if not db_goal:
+        return None
+
+    for field, value in goal_update.model_dump(exclude_unset=True).items():
+        setattr(db_goal, field, value)
+
+    await db.commit()
+    await db.refresh(db_goal)
+    return db_goal
+
+async def delete_goal(db: AsyncSession, goal_id: int, user_id: int) -> bool:
+    result = await db.execute(
+        delete(Goal).filter(
+            Goal.id == goal_id,
+            Goal.user_id == user_id
+        )
+    )
+    await db.commit()
+    return result.rowcount > 0
+
+async def get_goals_progress(db: AsyncSession, user_id: int, now: datetime, timezone: str) -> List[dict]:
+    """Progress of every goal of the user in its current local day or week.
+
+    One query: daily_totals rows of the current week, plus the activity still
+    running, are joined to goals through the tags they cover, directly or via
+    the tag type, and summed per goal. The week starts on Monday.
+    """
+    today = now.date()
+    week_start = today - timedelta(days=today.weekday())
+    contributions = period_contributions(user_id, today, week_start, timezone)
+
+    progress = func.coalesce(
+        func.sum(case(
+            (Goal.period == 'day', contributions.c.day_minutes),
+            else_=contributions.c.week_minutes
+        )),
+        literal(0, Float)
+    )
+    result = await db.execute(
+        select(Goal, progress)
+        .outerjoin(Tag, or_(Tag.id == Goal.tag_id, Tag.tag_type == Goal.tag_type_id))
+        .outerjoin(contributions, contributions.c.tag_id == Tag.id)
+        .filter(Goal.user_id == user_id)
+        .group_by(Goal.id)
+        .order_by(Goal.id)
+    )
+
+    goals = []
+    for goal, minutes in result.all():
+        minutes = max(float(minutes), 0)
+        goals.append({
+            'id': goal.id,
+            'user_id': goal.user_id,
+            'tag_id': goal.tag_id,
+            'tag_type_id': goal.tag_type_id,
+            'period': goal.period,
+            'target_minutes': goal.target_minutes,
+            'period_start': today if goal.period == 'day' else week_start,
+            'progress_minutes': minutes,
+            'progress_ratio': minutes / goal.target_minutes,
+            'completed': minutes >= goal.target_minutes,
+        })
+    return goals
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import ReportJob
+
+UNFINISHED = ('queued', 'running')
+
+async def create_report_job(db: AsyncSession, user_id: int, kind: str, params: dict, max_unfinished: int) -> ReportJob:
+    unfinished = await db.execute(
+        select(func.count()).select_from(ReportJob).filter(
+            ReportJob.user_id == user_id,
+            ReportJob.status.in_(UNFINISHED)
+        )
+    )
+    if unfinished.scalar_one() >= max_unfinished:
+        raise ValueError(f"At most {max_unfinished} reports can be queued or running at a time")
+
+    db_job = ReportJob(user_id=user_id, kind=kind, params=params, status='queued')
+    db.add(db_job)
+    await db.commit()
+    await db.refresh(db_job)
+    return db_job
+
+async def get_report_job(db: AsyncSession, job_id: int, user_id: int) -> Optional[ReportJob]:
+    result = await db.execute(
+        select(ReportJob).filter(
+            ReportJob.id == job_id,
+            ReportJob.user_id == user_id
+        )
+    )
+    return result.scalar_one_or_none()
+
+async def get_user_report_jobs(db: AsyncSession, user_id: int) -> List[ReportJob]:
+    result = await db.execute(
+        select(ReportJob).filter(ReportJob.user_id == user_id).order_by(ReportJob.id.desc())
+    )
+    return list(result.scalars().all())
+
+async def claim_report_job(db: AsyncSession, job_id: Optional[int] = None) -> Optional[ReportJob]:
+    """Move a queued job, the given one or else the oldest, to running and return it.
+
+    Rows are locked with SKIP LOCKED, so any number of workers in any number of
+    processes can claim concurrently and each job runs once.
+    """
+    candidate = (
+        select(ReportJob.id)
+        .filter(ReportJob.status == 'queued')
+        .order_by(ReportJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    if job_id is not None:
+        candidate = candidate.filter(ReportJob.id == job_id)
+
+    result = await db.execute(
+        update(ReportJob)
+        .where(ReportJob.id == candidate.scalar_subquery())
+        .values(status='running', started_at=datetime.utcnow())
+        .returning(ReportJob)
+    )
+    job = result.scalar_one_or_none()
+    await db.commit()
+    return job
+
+async def finish_report_job(
+    db: AsyncSession,
+    job_id: int,
+    result_path: Optional[str] = None,
+    error: Optional[str] = None
+) -> None:
+    await db.execute(
+        update(ReportJob)
+        .where(ReportJob.id == job_id)
+        .values(
+            status='failed' if error else 'done',
+            result_path=result_path,
+            error=error,
+            finished_at=datetime.utcnow()
+        )
+    )
+    await db.commit()
+
+async def requeue_stale_report_jobs(db: AsyncSession, timeout: int) -> int:
+    """Put back jobs left running longer than timeout seconds, e.g. by a killed worker"""
+    result = await db.execute(
+        update(ReportJob)
+        .where(
+            ReportJob.status == 'running',
+            ReportJob.started_at < datetime.utcnow() - timedelta(seconds=timeout)
+        )
+        .values(status='queued', started_at=None)
+    )
+    await db.commit()
+    return result.rowcount
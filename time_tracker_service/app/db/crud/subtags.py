@@ -1,8 +1,11 @@
 from typing import List, Optional
 from sqlalchemy import select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.models import Subtag, Tag
+from app.db.models import Activity, Subtag, Tag
+from app.db.crud.daily_totals import remove_activities_from_daily_totals
+from app.db.crud.user_settings import get_user_timezone
 from app.schemas.subtags import SubtagCreate, SubtagUpdate
+from app.utils.fields import Fields, fetch_fields, select_fields
 
 async def create_subtag(db: AsyncSession, user_id: int, subtag: SubtagCreate) -> Subtag:
     # Verify tag exists and belongs to user
@@ -35,14 +38,24 @@ async def get_subtag(db: AsyncSession, subtag_id: int, user_id: int) -> Optional
     )
     return result.scalar_one_or_none()
 
-async def get_tag_subtags(db: AsyncSession, tag_id: int, user_id: int) -> List[Subtag]:
-    result = await db.execute(
-        select(Subtag)
-        .join(Tag)
+async def get_tag_subtags(db: AsyncSession, tag_id: int, user_id: int, fields: Fields = None) -> List[Subtag]:
+    return await fetch_fields(
+        db,
+        select_fields(Subtag, fields)
+        .join(Tag, Tag.id == Subtag.tag_id)
         .filter(
             Subtag.tag_id == tag_id,
             Tag.user_id == user_id
-        )
+        ),
+        fields
+    )
+
+async def get_user_subtags(db: AsyncSession, user_id: int) -> List[Subtag]:
+    result = await db.execute(
+        select(Subtag)
+        .join(Tag, Tag.id == Subtag.tag_id)
+        .filter(Tag.user_id == user_id)
+        .order_by(Subtag.tag_id, Subtag.id)
     )
     return list(result.scalars().all())
 
@@ -67,6 +80,16 @@ async def delete_subtag(db: AsyncSession, subtag_id: int, user_id: int) -> bool:
     if not db_subtag:
         return False
 
+    # Delete the activities here rather than through the cascade, their times
+    # are needed to take their minutes out of the rollup
+    removed = await db.execute(
+        delete(Activity)
+        .filter(Activity.subtag_id == subtag_id)
+        .returning(Activity.tag_id, Activity.start, Activity.end)
+    )
+    timezone = await get_user_timezone(db, user_id)
+    await remove_activities_from_daily_totals(db, user_id, removed.all(), timezone)
+
     await db.execute(
         delete(Subtag).filter(Subtag.id == subtag_id)
     )
@@ -0,0 +1,104 @@
+from datetime import date, timedelta
+from typing import Collection, List, Optional
+from sqlalchemy import select, delete, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import DailyTotal, TagMetrics
+
+# Gaps and islands over daily_totals: consecutive days share day - row_number().
+# Keeps the latest island and the longest island length per tag
+RECOMPUTE_TAG_METRICS = """
+    INSERT INTO tag_metrics (user_id, tag_id, streak_start, streak_end, longest_streak)
+    SELECT DISTINCT ON (user_id, tag_id) user_id, tag_id, streak_start, streak_end, longest_streak
+    FROM (
+        SELECT user_id, tag_id, min(day) AS streak_start, max(day) AS streak_end,
+               max(count(*)) OVER (PARTITION BY user_id, tag_id) AS longest_streak
+        FROM (
+            SELECT user_id, tag_id, day,
+                   day - CAST(row_number() OVER (PARTITION BY user_id, tag_id ORDER BY day) AS integer) AS island
+            FROM daily_totals
+            WHERE minutes > 0
+              AND (CAST(:user_id AS integer) IS NULL OR user_id = :user_id)
+              AND (CAST(:tag_id AS integer) IS NULL OR tag_id = :tag_id)
+        ) AS days
+        GROUP BY user_id, tag_id, island
+    ) AS islands
+    ORDER BY user_id, tag_id, streak_end DESC
+"""
+
+async def recompute_tag_metrics(db: AsyncSession, user_id: int, tag_id: Optional[int] = None) -> None:
+    """Rebuild metrics of one tag, or of all the user's tags, from daily_totals. The caller commits"""
+    stmt = delete(TagMetrics).filter(TagMetrics.user_id == user_id)
+    if tag_id is not None:
+        stmt = stmt.filter(TagMetrics.tag_id == tag_id)
+    await db.execute(stmt)
+    await db.execute(text(RECOMPUTE_TAG_METRICS), {'user_id': user_id, 'tag_id': tag_id})
+
+async def update_tag_metrics(
+    db: AsyncSession,
+    user_id: int,
+    tag_id: int,
+    days: Collection[date],
+    added: bool
+) -> None:
+    """Account for minutes added to or removed from a contiguous run of days.
+
+    Adding to or right after the latest streak, the usual case of closing
+    today's activity, is resolved from the stored row alone. Removals and
+    backfills before the latest streak fall back to recomputing the tag.
+    """
+    metrics = await db.get(TagMetrics, (user_id, tag_id))
+    first_day, last_day = min(days), max(days)
+
+    if metrics is None or not added or first_day < metrics.streak_start:
+        await recompute_tag_metrics(db, user_id, tag_id)
+        return
+
+    if first_day > metrics.streak_end + timedelta(days=1):
+        # A gap before these days starts a new streak
+        metrics.streak_start = first_day
+        metrics.streak_end = last_day
+    else:
+        metrics.streak_end = max(metrics.streak_end, last_day)
+    streak = (metrics.streak_end - metrics.streak_start).days + 1
+    metrics.longest_streak = max(metrics.longest_streak, streak)
+
+async def get_tag_metrics(db: AsyncSession, user_id: int, today: date) -> List[dict]:
+    """Streaks and 7/30-day rolling averages per tag, today being the user's local day.
+
+    Reads one metrics row and at most 30 daily totals per tag, whatever the
+    length of the history.
+    """
+    window_start = today - timedelta(days=29)
+    week_start = today - timedelta(days=6)
+    rolling = await db.execute(
+        select(
+            DailyTotal.tag_id,
+            func.sum(DailyTotal.minutes).filter(DailyTotal.day >= week_start),
+            func.sum(DailyTotal.minutes)
+        )
+        .filter(
+            DailyTotal.user_id == user_id,
+            DailyTotal.day >= window_start,
+            DailyTotal.day <= today
+        )
+        .group_by(DailyTotal.tag_id)
+    )
+    sums = {tag_id: (week or 0, month or 0) for tag_id, week, month in rolling.all()}
+
+    result = await db.execute(
+        select(TagMetrics).filter(TagMetrics.user_id == user_id).order_by(TagMetrics.tag_id)
+    )
+    metrics = []
+    for row in result.scalars().all():
+        # A streak is still current if the tag was used today or yesterday
+        alive = row.streak_end >= today - timedelta(days=1)
+        week, month = sums.get(row.tag_id, (0, 0))
+        metrics.append({
+            'tag_id': row.tag_id,
+            'current_streak_days': (row.streak_end - row.streak_start).days + 1 if alive else 0,
+            'longest_streak_days': row.longest_streak,
+            'last_active_day': row.streak_end,
+            'rolling_7d_average_minutes': week / 7,
+            'rolling_30d_average_minutes': month / 30,
+        })
+    return metrics
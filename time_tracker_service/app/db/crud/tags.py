@@ -3,6 +3,7 @@ from sqlalchemy import select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models import Tag, TagType
 from app.schemas.tags import TagCreate, TagUpdate
+from app.utils.fields import Fields, fetch_fields, select_fields
 
 async def create_tag(db: AsyncSession, user_id: int, tag: TagCreate) -> Tag:
     # Verify tag_type exists and belongs to user if provided
@@ -36,11 +37,12 @@ async def get_tag(db: AsyncSession, tag_id: int, user_id: int) -> Optional[Tag]:
     )
     return result.scalar_one_or_none()
 
-async def get_user_tags(db: AsyncSession, user_id: int) -> List[Tag]:
-    result = await db.execute(
-        select(Tag).filter(Tag.user_id == user_id)
+async def get_user_tags(db: AsyncSession, user_id: int, fields: Fields = None) -> List[Tag]:
+    return await fetch_fields(
+        db,
+        select_fields(Tag, fields).filter(Tag.user_id == user_id),
+        fields
     )
-    return list(result.scalars().all())
 
 async def update_tag(
     db: AsyncSession,
@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import List, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import TokenRevocation
+from app.utils.timezones import epoch_seconds
+
+REVOCATION_CHANNEL = 'token_revocation'
+
+async def record_revocation(db: AsyncSession, user_id: int, revoked_before: datetime) -> datetime:
+    """Store the revocation, keeping the later cutoff, and NOTIFY every worker
+    with '<user_id>:<epoch seconds>' once committed. Returns the stored cutoff."""
+    stmt = insert(TokenRevocation).values(user_id=user_id, revoked_before=revoked_before)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TokenRevocation.user_id],
+        set_={'revoked_before': func.greatest(TokenRevocation.revoked_before, stmt.excluded.revoked_before)}
+    ).returning(TokenRevocation.revoked_before)
+    stored = (await db.execute(stmt)).scalar_one()
+    await db.execute(select(func.pg_notify(REVOCATION_CHANNEL, f'{user_id}:{epoch_seconds(stored)}')))
+    await db.commit()
+    return stored
+
+async def get_revocations_since(db: AsyncSession, since: datetime) -> List[Tuple[int, datetime]]:
+    result = await db.execute(
+        select(TokenRevocation.user_id, TokenRevocation.revoked_before)
+        .filter(TokenRevocation.revoked_before > since)
+    )
+    return [tuple(row) for row in result.all()]
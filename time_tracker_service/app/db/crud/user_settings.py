@@ -0,0 +1,42 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import UserSettings
+from app.schemas.user_settings import UserSettingsUpdate
+from app.db.crud.daily_totals import rebuild_daily_totals
+from app.utils.timezones import DEFAULT_TIMEZONE
+
+async def get_user_settings(db: AsyncSession, user_id: int) -> UserSettings:
+    result = await db.execute(
+        select(UserSettings).filter(UserSettings.user_id == user_id)
+    )
+    # Users who never saved settings get the defaults
+    return result.scalar_one_or_none() or UserSettings(user_id=user_id, timezone=DEFAULT_TIMEZONE)
+
+async def get_user_timezone(db: AsyncSession, user_id: int) -> str:
+    result = await db.execute(
+        select(UserSettings.timezone).filter(UserSettings.user_id == user_id)
+    )
+    return result.scalar_one_or_none() or DEFAULT_TIMEZONE
+
+async def update_user_settings(
+    db: AsyncSession,
+    user_id: int,
+    settings_update: UserSettingsUpdate
+) -> UserSettings:
+    db_settings = await db.get(UserSettings, user_id)
+    if db_settings is None:
+        db_settings = UserSettings(user_id=user_id)
+        db.add(db_settings)
+
+    old_timezone = db_settings.timezone or DEFAULT_TIMEZONE
+    for field, value in settings_update.model_dump().items():
+        setattr(db_settings, field, value)
+
+    # Local days moved, so every rollup row of the user has to be recut
+    if db_settings.timezone != old_timezone:
+        await db.flush()
+        await rebuild_daily_totals(db, user_id)
+
+    await db.commit()
+    await db.refresh(db_settings)
+    return db_settings
@@ -2,10 +2,24 @@ from .activities import Activity
 from .tags import Tag
 from .subtags import Subtag
 from .tag_types import TagType
+from .user_settings import UserSettings
+from .daily_totals import DailyTotal
+from .tag_metrics import TagMetrics
+from .goals import Goal
+from .report_jobs import ReportJob
+from .user_data_versions import UserDataVersion
+from .token_revocations import TokenRevocation
 
 __all__ = [
     "Activity",
     "Tag",
     "Subtag",
     "TagType",
+    "UserSettings",
+    "DailyTotal",
+    "TagMetrics",
+    "Goal",
+    "ReportJob",
+    "UserDataVersion",
+    "TokenRevocation",
 ]
\ No newline at end of file
@@ -1,15 +1,30 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from app.db.db_vitals import Base
 from datetime import datetime
 
+# Text searched by /activities/search. Queries must use this exact expression
+# for the planner to match the GIN index
+SEARCH_DOCUMENT = "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, ''))"
+
+# [start, end) of an activity, open activities run to infinity. Same rule as
+# SEARCH_DOCUMENT: overlap queries must use this exact expression
+TIME_RANGE = "tsrange(start, coalesce(\"end\", 'infinity'::timestamp))"
+
 class Activity(Base):
     __tablename__ = "activities"
+    __table_args__ = (
+        Index("ix_activities_user_id_start", "user_id", "start"),
+        # btree_gin lets user_id share the GIN index with the search document
+        Index("ix_activities_search", "user_id", text(SEARCH_DOCUMENT), postgresql_using="gin"),
+        # btree_gist, for overlap lookups within a user
+        Index("ix_activities_user_id_range", "user_id", text(TIME_RANGE), postgresql_using="gist"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, index=True)
-    tag_id = Column(Integer, ForeignKey("tags.id"))
-    subtag_id = Column(Integer, ForeignKey("subtags.id"), nullable=True)
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), index=True)
+    subtag_id = Column(Integer, ForeignKey("subtags.id", ondelete="CASCADE"), nullable=True, index=True)
     name = Column(String)
     description = Column(String)
     start = Column(DateTime, default=datetime.utcnow)
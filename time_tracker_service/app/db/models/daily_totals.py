@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey
+from app.db.db_vitals import Base
+
+class DailyTotal(Base):
+    """Minutes of closed activities per user, local day and tag.
+
+    Maintained incrementally by the activity CRUD functions and rebuilt when
+    the user changes time zone.
+    """
+    __tablename__ = "daily_totals"
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    day = Column(Date, primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+    minutes = Column(Float, nullable=False, default=0)
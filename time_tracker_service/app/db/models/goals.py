@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, CheckConstraint
+from sqlalchemy.orm import relationship
+from app.db.db_vitals import Base
+
+class Goal(Base):
+    __tablename__ = "goals"
+    __table_args__ = (
+        CheckConstraint(
+            "(tag_id IS NULL) <> (tag_type_id IS NULL)",
+            name="ck_goals_tag_or_tag_type"
+        ),
+        CheckConstraint("period IN ('day', 'week')", name="ck_goals_period"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    user_id = Column(Integer, index=True)
+    # A goal targets either a single tag or every tag of a tag type
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), nullable=True)
+    tag_type_id = Column(Integer, ForeignKey("tag_types.id", ondelete="CASCADE"), nullable=True)
+    period = Column(String, nullable=False)
+    target_minutes = Column(Float, nullable=False)
+
+    # Relationships
+    tag = relationship("Tag")
+    tag_type = relationship("TagType")
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index, text
+from app.db.db_vitals import Base
+from datetime import datetime
+
+class ReportJob(Base):
+    __tablename__ = "report_jobs"
+    __table_args__ = (
+        # Workers claim the oldest queued job, finished jobs stay out of the index
+        Index("ix_report_jobs_queued", "id", postgresql_where=text("status = 'queued'")),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    user_id = Column(Integer, index=True)
+    kind = Column(String, nullable=False)
+    params = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="queued")  # queued, running, done, failed
+    error = Column(String, nullable=True)
+    result_path = Column(String, nullable=True)
+    progress = Column(Integer, nullable=False, default=0, server_default="0")  # rows processed so far
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
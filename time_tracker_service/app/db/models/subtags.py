@@ -6,9 +6,9 @@ class Subtag(Base):
     __tablename__ = "subtags"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    tag_id = Column(Integer, ForeignKey("tags.id"))
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"))
     name = Column(String)
 
     # Relationships
     tag = relationship("Tag", back_populates="subtags")
-    activities = relationship("Activity", back_populates="subtag", cascade="all, delete-orphan") 
\ No newline at end of file
+    activities = relationship("Activity", back_populates="subtag", cascade="all, delete-orphan", passive_deletes=True) 
\ No newline at end of file
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey
+from app.db.db_vitals import Base
+
+class TagMetrics(Base):
+    """Latest streak of consecutive active days and longest streak per tag.
+
+    Derived from daily_totals and kept up to date whenever those change.
+    """
+    __tablename__ = "tag_metrics"
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+    streak_start = Column(Date, nullable=False)
+    streak_end = Column(Date, nullable=False)
+    longest_streak = Column(Integer, nullable=False)
@@ -10,4 +10,4 @@ class TagType(Base):
     name = Column(String)
 
     # Relationship with tags
-    tags = relationship("Tag", back_populates="tag_type", cascade="all, delete-orphan") 
\ No newline at end of file
+    tags = relationship("Tag", back_populates="tag_type_rel", cascade="all, delete-orphan", passive_deletes=True) 
\ No newline at end of file
@@ -9,9 +9,9 @@ class Tag(Base):
     user_id = Column(Integer, index=True)
     name = Column(String)
     color = Column(String)
-    tag_type = Column(Integer, ForeignKey("tag_types.id"))
+    tag_type = Column(Integer, ForeignKey("tag_types.id", ondelete="CASCADE"))
 
     # Relationships
     tag_type_rel = relationship("TagType", back_populates="tags")
-    subtags = relationship("Subtag", back_populates="tag", cascade="all, delete-orphan")
-    activities = relationship("Activity", back_populates="tag", cascade="all, delete-orphan") 
\ No newline at end of file
+    subtags = relationship("Subtag", back_populates="tag", cascade="all, delete-orphan", passive_deletes=True)
+    activities = relationship("Activity", back_populates="tag", cascade="all, delete-orphan", passive_deletes=True) 
\ No newline at end of file
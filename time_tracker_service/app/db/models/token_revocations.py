@@ -0,0 +1,10 @@
+from sqlalchemy import Column, DateTime, Integer
+from app.db.db_vitals import Base
+
+class TokenRevocation(Base):
+    """Latest revocation pushed by the auth service per user: tokens issued
+    at or before revoked_before (UTC) are denied, see app.utils.revocations"""
+    __tablename__ = "token_revocations"
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    revoked_before = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,15 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer
+from app.db.db_vitals import Base
+
+class UserDataVersion(Base):
+    """Counter bumped by database triggers whenever any of a user's rows change.
+
+    Maintained by the bump_user_data_versions() trigger function (see the
+    user_data_versions migration), which also NOTIFYs 'user_data_version' with
+    '<user_id>:<version>' so workers can cache it, see app.utils.data_versions.
+    """
+    __tablename__ = "user_data_versions"
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, nullable=False)
@@ -0,0 +1,8 @@
+from sqlalchemy import Column, Integer, String
+from app.db.db_vitals import Base
+
+class UserSettings(Base):
+    __tablename__ = "user_settings"
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    timezone = Column(String, nullable=False, default="UTC", server_default="UTC")
@@ -5,7 +5,15 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.config.settings import settings
 from app.db.db_vitals import initiate_db
-from app.routers import tag_types, tags, subtags, activities
+from app.routers import tag_types, tags, subtags, activities, user_settings, goals, reports, suggestions, dashboard, internal
+from app.utils.auth import claims_cache
+from app.utils.compression import CompressionMiddleware, compression_metrics
+from app.utils.data_versions import data_versions
+from app.utils.notifications import listener
+from app.utils.revocations import deny_list
+from app.utils.executor import shutdown_stats_executor
+from app.utils.jobs import start_report_workers, stop_report_workers
+from app.utils.singleflight import singleflight_metrics
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -22,15 +30,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(CompressionMiddleware)
+
 # Include routers
 app.include_router(tag_types.router)
 app.include_router(tags.router)
 app.include_router(subtags.router)
 app.include_router(activities.router)
+app.include_router(user_settings.router)
+app.include_router(goals.router)
+app.include_router(reports.router)
+app.include_router(suggestions.router)
+app.include_router(dashboard.router)
+app.include_router(internal.router)
 
 @app.on_event("startup")
 async def startup_event():
     await initiate_db()
+    await start_report_workers()
+    listener.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_report_workers()
+    await listener.stop()
+    shutdown_stats_executor()
 
 @app.get("/")
 async def root():
@@ -44,5 +68,10 @@ async def root():
 async def health_check():
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.utcnow().isoformat(),
+        "singleflight": singleflight_metrics(),
+        "compression": compression_metrics(),
+        "data_versions": data_versions.metrics(),
+        "auth_claims": claims_cache.metrics(),
+        "revocations": deny_list.metrics()
     } 
\ No newline at end of file
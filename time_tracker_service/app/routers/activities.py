@@ -1,91 +1,303 @@
-from datetime import datetime
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date, datetime
+from functools import partial
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.db_vitals import get_async_db
+from app.db.db_vitals import async_session, get_async_db
 from app.db.crud.activities import (
     create_activity,
     get_activity,
     get_user_activities,
     get_activities_after,
     get_activities_in_range,
+    search_activities,
+    get_overlapping_activities,
+    OverlapError,
     update_activity,
     close_activity,
     delete_activity,
-    get_daily_stats,
-    get_weekly_stats
+    get_bucketed_stats,
+    get_timeline,
+    get_hour_of_week_matrix,
+    compare_ranges
 )
 from app.schemas.activities import (
     ActivityCreate,
     ActivityUpdate,
     ActivityResponse,
+    ActivitySearchPage,
+    ActivityOverlap,
     TimeRange,
-    DailyStats,
-    WeeklyStats,
-    ActivityStats
+    PeriodStats,
+    Timeline,
+    Heatmap,
+    HourOfWeekStats,
+    StatsComparisonRequest,
+    StatsComparison,
+    TagMetricsResponse
 )
-from app.routers.tag_types import get_current_user_id
+from app.db.crud.daily_totals import get_year_totals
+from app.db.crud.tag_metrics import get_tag_metrics
+from app.db.crud.user_settings import get_user_timezone
+from app.config.settings import settings
+from app.utils.auth import get_current_user_id
+from app.utils.columnar import ACTIVITY_COLUMNS, COLUMNAR_MEDIA_TYPE, columnar_response, wants_columnar
+from app.utils.fields import Fields, fields_param, sparse_model
+from app.utils.http import conditional, refresh_data_version
+from app.utils.responses import model_response
+from app.utils.singleflight import SingleFlight
+from app.utils.stats import parse_granularity, stats_key
+from app.utils.suggestions import record_activity
+from app.utils.timezones import naive_utc, to_local
 
-router = APIRouter(prefix="/activities", tags=["activities"])
+router = APIRouter(prefix="/activities", tags=["activities"], dependencies=[Depends(refresh_data_version)])
+
+stats_flight = SingleFlight("activities.stats")
+
+async def _shared_bucketed_stats(*args):
+    """Stats for stats_flight, in a session of its own: the computation outlives
+    the request that started it, whose session is closed when it goes away"""
+    async with async_session() as db:
+        return await get_bucketed_stats(db, *args)
+
+COLUMNAR_RESPONSE = {
+    200: {"content": {COLUMNAR_MEDIA_TYPE: {}}, "description": "Columnar format, see app.utils.columnar"}
+}
+
+# Validators of results that count running activities up to now or depend on today
+clock_conditional = conditional(period=settings.ETAG_CLOCK_PERIOD)
+
+def query_time_range(
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    body: Optional[TimeRange] = Body(None, description="deprecated, pass start and end as query parameters")
+) -> TimeRange:
+    """Range from the query string, falling back to the JSON body older clients send on GET.
+    Returned as naive UTC, as the queries bind it"""
+    if start is None and end is None and body is not None:
+        time_range = body
+    else:
+        try:
+            time_range = TimeRange(start=start, end=end)
+        except ValidationError as e:
+            raise RequestValidationError([
+                {**error, "loc": ("query", *error["loc"])}
+                for error in e.errors(include_url=False, include_context=False)
+            ])
+    return TimeRange(start=naive_utc(time_range.start), end=naive_utc(time_range.end))
 
 @router.post("", response_model=ActivityResponse, status_code=status.HTTP_201_CREATED)
 async def create_activity_endpoint(
     activity: ActivityCreate,
+    strict: bool = Query(False, description="reject the activity if it overlaps another one"),
     db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
     try:
-        return await create_activity(db, current_user_id, activity)
+        db_activity = await create_activity(db, current_user_id, activity, strict)
+    except OverlapError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    record_activity(
+        current_user_id, db_activity.name, db_activity.tag_id, db_activity.subtag_id, db_activity.start
+    )
+    return db_activity
+
+def activities_response(request: Request, activities: List, fields: Fields, headers: Dict[str, str]) -> Response:
+    """Activities in the columnar format if the client asks for it, else as a JSON list"""
+    if wants_columnar(request):
+        return columnar_response(activities, fields or ACTIVITY_COLUMNS, headers)
+    return model_response(
+        List[sparse_model(ActivityResponse, fields)], activities, headers={"Vary": "Accept", **headers}
+    )
 
-@router.get("", response_model=List[ActivityResponse])
+@router.get("", response_model=List[ActivityResponse], responses=COLUMNAR_RESPONSE)
 async def get_activities(
+    request: Request,
+    fields: Fields = Depends(fields_param(ActivityResponse)),
+    validators: Dict[str, str] = Depends(conditional()),
     db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
-    return await get_user_activities(db, current_user_id)
+    return activities_response(
+        request, await get_user_activities(db, current_user_id, fields), fields, validators
+    )
 
 @router.get("/after/{start_time}", response_model=List[ActivityResponse])
 async def get_activities_after_endpoint(
     start_time: datetime,
+    fields: Fields = Depends(fields_param(ActivityResponse)),
+    validators: Dict[str, str] = Depends(conditional()),
     db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
-    return await get_activities_after(db, current_user_id, start_time)
+    return model_response(
+        List[sparse_model(ActivityResponse, fields)],
+        await get_activities_after(db, current_user_id, start_time, fields),
+        headers=validators
+    )
 
-@router.get("/range", response_model=List[ActivityResponse])
+@router.get("/range", response_model=List[ActivityResponse], responses=COLUMNAR_RESPONSE)
 async def get_activities_in_range_endpoint(
-    time_range: TimeRange,
+    request: Request,
+    time_range: TimeRange = Depends(query_time_range),
+    fields: Fields = Depends(fields_param(ActivityResponse)),
+    validators: Dict[str, str] = Depends(conditional()),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    return activities_response(
+        request,
+        await get_activities_in_range(db, current_user_id, time_range.start, time_range.end, fields),
+        fields,
+        validators
+    )
+
+@router.get("/overlaps", response_model=List[ActivityOverlap], dependencies=[Depends(conditional())])
+async def get_overlaps_endpoint(
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    return await get_overlapping_activities(
+        db, current_user_id,
+        naive_utc(start) if start else None,
+        naive_utc(end) if end else None,
+        limit
+    )
+
+@router.get("/search", response_model=ActivitySearchPage, dependencies=[Depends(conditional())])
+async def search_activities_endpoint(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
-    return await get_activities_in_range(db, current_user_id, time_range.start, time_range.end)
+    try:
+        rows, next_cursor = await search_activities(db, current_user_id, q, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return {
+        "items": [
+            {**ActivityResponse.model_validate(activity).model_dump(), "rank": rank}
+            for activity, rank in rows
+        ],
+        "next_cursor": next_cursor
+    }
 
-@router.get("/stats", response_model=ActivityStats)
+@router.get("/stats", response_model=Dict[str, PeriodStats], dependencies=[Depends(clock_conditional)])
 async def get_activity_stats(
-    time_range: TimeRange,
+    time_range: TimeRange = Depends(query_time_range),
+    granularity: List[str] = Query(
+        ["day", "week"],
+        description="hour, day, week, month, year or <N>d, repeated or comma separated"
+    ),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    try:
+        granularities = list(dict.fromkeys(
+            parse_granularity(value)
+            for values in granularity
+            for value in values.split(",")
+        ))
+        start, end = naive_utc(time_range.start), naive_utc(time_range.end)
+        # Identical requests in flight, e.g. from several devices, share one computation
+        stats = await stats_flight.do(
+            (current_user_id, start, end, tuple(sorted(granularities))),
+            partial(_shared_bucketed_stats, current_user_id, start, end, granularities)
+        )
+        return {stats_key(name): result for name, result in stats.items()}
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/stats/hour-of-week", response_model=HourOfWeekStats, dependencies=[Depends(clock_conditional)])
+async def get_hour_of_week_endpoint(
+    time_range: TimeRange = Depends(query_time_range),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    return await get_hour_of_week_matrix(
+        db, current_user_id, naive_utc(time_range.start), naive_utc(time_range.end)
+    )
+
+@router.post("/stats/compare", response_model=StatsComparison)
+async def compare_stats_endpoint(
+    comparison: StatsComparisonRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    ranges = [(naive_utc(time_range.start), naive_utc(time_range.end)) for time_range in comparison.ranges]
+    if any(start >= end for start, end in ranges):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end time must be after start time"
+        )
+    return {
+        "group_by": comparison.group_by,
+        "ranges": await compare_ranges(
+            db, current_user_id, ranges, comparison.group_by, comparison.top_n
+        )
+    }
+
+@router.get("/metrics", response_model=List[TagMetricsResponse], dependencies=[Depends(clock_conditional)])
+async def get_metrics_endpoint(
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    timezone = await get_user_timezone(db, current_user_id)
+    today = to_local(datetime.utcnow(), timezone).date()
+    return await get_tag_metrics(db, current_user_id, today)
+
+@router.get("/timeline", response_model=Timeline, dependencies=[Depends(clock_conditional)])
+async def get_timeline_endpoint(
+    days: int = Query(7, ge=1, le=90),
+    bucket_minutes: int = Query(60, ge=5, le=1440),
+    end: Optional[datetime] = Query(None, description="defaults to now"),
     db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
     try:
-        daily = await get_daily_stats(db, current_user_id, time_range.start, time_range.end)
-        weekly = await get_weekly_stats(db, current_user_id, time_range.start, time_range.end)
-        return {
-            "daily": daily,
-            "weekly": weekly
-        }
+        end = naive_utc(end) if end else datetime.utcnow()
+        return await get_timeline(db, current_user_id, end, days, bucket_minutes)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
 
-@router.get("/{activity_id}", response_model=ActivityResponse)
+@router.get("/heatmap", response_model=Heatmap, dependencies=[Depends(conditional())])
+async def get_heatmap_endpoint(
+    year: int = Query(..., ge=1970, le=9999),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    # Served from the daily rollup, running activities count once they are closed
+    return {
+        "year": year,
+        "start": date(year, 1, 1).isoformat(),
+        "minutes": await get_year_totals(db, current_user_id, year)
+    }
+
+@router.get("/{activity_id}", response_model=ActivityResponse, dependencies=[Depends(conditional())])
 async def get_activity_endpoint(
     activity_id: int,
     db: AsyncSession = Depends(get_async_db),
@@ -103,17 +315,23 @@ async def get_activity_endpoint(
 async def update_activity_endpoint(
     activity_id: int,
     activity_update: ActivityUpdate,
+    strict: bool = Query(False, description="reject the update if the activity would overlap another one"),
     db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
     try:
-        activity = await update_activity(db, activity_id, current_user_id, activity_update)
+        activity = await update_activity(db, activity_id, current_user_id, activity_update, strict)
         if not activity:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Activity not found"
             )
         return activity
+    except OverlapError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -0,0 +1,66 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.db.db_vitals import async_session
+from app.db.crud.activities import get_recent_activities, get_running_activity
+from app.db.crud.daily_totals import get_period_totals
+from app.db.crud.subtags import get_user_subtags
+from app.db.crud.tag_types import get_user_tag_types
+from app.db.crud.tags import get_user_tags
+from app.db.crud.user_settings import get_user_timezone
+from app.schemas.dashboard import Dashboard
+from app.utils.auth import get_current_user_id
+from app.utils.http import conditional
+from app.utils.responses import model_response
+from app.utils.timezones import to_local
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+async def _in_own_session(query, *args):
+    """Run a CRUD function in a session of its own, so the dashboard's
+    independent queries run concurrently on separate pooled connections"""
+    async with async_session() as db:
+        return await query(db, *args)
+
+
+async def _period_totals(db: AsyncSession, user_id: int) -> tuple:
+    timezone = await get_user_timezone(db, user_id)
+    today = to_local(datetime.utcnow(), timezone).date()
+    return today, await get_period_totals(db, user_id, today, timezone)
+
+
+@router.get("", response_model=Dashboard)
+async def get_dashboard(
+    recent: int = Query(20, ge=0, le=100, description="number of recent activities"),
+    validators: Dict[str, str] = Depends(conditional(period=settings.ETAG_CLOCK_PERIOD)),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Everything the dashboard shows on load in one round trip"""
+    (today, totals), running, recent_activities, tag_types, tags, subtags = await asyncio.gather(
+        _in_own_session(_period_totals, current_user_id),
+        _in_own_session(get_running_activity, current_user_id),
+        _in_own_session(get_recent_activities, current_user_id, recent),
+        _in_own_session(get_user_tag_types, current_user_id),
+        _in_own_session(get_user_tags, current_user_id),
+        _in_own_session(get_user_subtags, current_user_id),
+    )
+    return model_response(
+        Dashboard,
+        {
+            "today": today,
+            "week_start": today - timedelta(days=today.weekday()),
+            "running": running,
+            "today_minutes": sum(total["today_minutes"] for total in totals),
+            "week_minutes": sum(total["week_minutes"] for total in totals),
+            "totals": totals,
+            "recent": recent_activities,
+            "taxonomy": {"tag_types": tag_types, "tags": tags, "subtags": subtags},
+        },
+        headers=validators
+    )
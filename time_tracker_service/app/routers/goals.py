@@ -0,0 +1,98 @@
+from datetime import datetime
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.db_vitals import get_async_db
+from app.db.crud.goals import (
+    create_goal,
+    get_goal,
+    get_user_goals,
+    update_goal,
+    delete_goal,
+    get_goals_progress
+)
+from app.db.crud.user_settings import get_user_timezone
+from app.schemas.goals import GoalCreate, GoalUpdate, GoalResponse, GoalProgress
+from app.utils.auth import get_current_user_id
+from app.utils.http import conditional, refresh_data_version
+from app.utils.timezones import to_local
+from app.config.settings import settings
+
+router = APIRouter(prefix="/goals", tags=["goals"], dependencies=[Depends(refresh_data_version)])
+
+@router.post("", response_model=GoalResponse, status_code=status.HTTP_201_CREATED)
+async def create_goal_endpoint(
+    goal: GoalCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    try:
+        return await create_goal(db, current_user_id, goal)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("", response_model=List[GoalResponse], dependencies=[Depends(conditional())])
+async def get_goals(
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    return await get_user_goals(db, current_user_id)
+
+@router.get(
+    "/progress",
+    response_model=List[GoalProgress],
+    dependencies=[Depends(conditional(period=settings.ETAG_CLOCK_PERIOD))]
+)
+async def get_goals_progress_endpoint(
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    timezone = await get_user_timezone(db, current_user_id)
+    now = to_local(datetime.utcnow(), timezone)
+    return await get_goals_progress(db, current_user_id, now, timezone)
+
+@router.get("/{goal_id}", response_model=GoalResponse, dependencies=[Depends(conditional())])
+async def get_goal_endpoint(
+    goal_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    goal = await get_goal(db, goal_id, current_user_id)
+    if not goal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Goal not found"
+        )
+    return goal
+
+@router.put("/{goal_id}", response_model=GoalResponse)
+async def update_goal_endpoint(
+    goal_id: int,
+    goal_update: GoalUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    goal = await update_goal(db, goal_id, current_user_id, goal_update)
+    if not goal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Goal not found"
+        )
+    return goal
+
+@router.delete("/{goal_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_goal_endpoint(
+    goal_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    deleted = await delete_goal(db, goal_id, current_user_id)
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Goal not found"
+        )
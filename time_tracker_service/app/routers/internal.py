@@ -0,0 +1,36 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.db_vitals import get_async_db
+from app.db.crud.token_revocations import record_revocation
+from app.schemas.revocations import RevocationNotice
+from app.utils.auth import verify_token
+from app.utils.revocations import deny_list
+from app.utils.timezones import epoch_seconds
+
+# Called by the other Chronary services, not by clients
+router = APIRouter(prefix="/internal", tags=["internal"], include_in_schema=False)
+
+@router.post("/revocations", status_code=status.HTTP_204_NO_CONTENT)
+async def revocation_endpoint(
+    notice: RevocationNotice,
+    db: AsyncSession = Depends(get_async_db)
+):
+    payload = verify_token(notice.token)
+    if (
+        not payload
+        or payload.get("type") != "revocation"
+        or not str(payload.get("sub", "")).isdigit()
+        or isinstance(payload.get("revoked_before"), bool)
+        or not isinstance(payload.get("revoked_before"), (int, float))
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid revocation token"
+        )
+    user_id = int(payload["sub"])
+    stored = await record_revocation(db, user_id, datetime.utcfromtimestamp(payload["revoked_before"]))
+    # The NOTIFY reaches this worker too, but not before the response
+    deny_list.add(user_id, epoch_seconds(stored))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,74 @@
+import os
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.db_vitals import get_async_db
+from app.db.crud.report_jobs import get_report_job, get_user_report_jobs
+from app.schemas.reports import ReportCreate, ReportJobResponse
+from app.utils.auth import get_current_user_id
+from app.utils.jobs import MEDIA_TYPES, submit_job
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+@router.post("", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_report_endpoint(
+    report: ReportCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    try:
+        return await submit_job(
+            db, current_user_id, report.kind, report.model_dump(mode="json", exclude={"kind"})
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
+
+@router.get("", response_model=List[ReportJobResponse])
+async def get_reports(
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    return await get_user_report_jobs(db, current_user_id)
+
+@router.get("/{job_id}", response_model=ReportJobResponse)
+async def get_report_endpoint(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    job = await get_report_job(db, job_id, current_user_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found"
+        )
+    return job
+
+@router.get("/{job_id}/download")
+async def download_report_endpoint(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    job = await get_report_job(db, job_id, current_user_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found"
+        )
+    if job.status != "done" or not job.result_path or not os.path.exists(job.result_path):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Report is {job.status}" if job.status != "done" else "Job has no result file"
+        )
+    extension = os.path.splitext(job.result_path)[1]
+    return FileResponse(
+        job.result_path,
+        media_type=MEDIA_TYPES[job.kind, extension],
+        filename=f"report-{job.id}{extension}"
+    )
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -11,9 +11,12 @@ from app.db.crud.subtags import (
     delete_subtag
 )
 from app.schemas.subtags import SubtagCreate, SubtagUpdate, SubtagResponse
-from app.routers.tag_types import get_current_user_id
+from app.utils.auth import get_current_user_id
+from app.utils.fields import Fields, fields_param, sparse_model
+from app.utils.http import conditional, refresh_data_version
+from app.utils.responses import model_response
 
-router = APIRouter(prefix="/subtags", tags=["subtags"])
+router = APIRouter(prefix="/subtags", tags=["subtags"], dependencies=[Depends(refresh_data_version)])
 
 @router.post("", response_model=SubtagResponse, status_code=status.HTTP_201_CREATED)
 async def create_subtag_endpoint(
@@ -32,12 +35,18 @@ async def create_subtag_endpoint(
 @router.get("/by-tag/{tag_id}", response_model=List[SubtagResponse])
 async def get_subtags_by_tag(
     tag_id: int,
+    fields: Fields = Depends(fields_param(SubtagResponse)),
+    validators: Dict[str, str] = Depends(conditional()),
     db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
-    return await get_tag_subtags(db, tag_id, current_user_id)
+    return model_response(
+        List[sparse_model(SubtagResponse, fields)],
+        await get_tag_subtags(db, tag_id, current_user_id, fields),
+        headers=validators
+    )
 
-@router.get("/{subtag_id}", response_model=SubtagResponse)
+@router.get("/{subtag_id}", response_model=SubtagResponse, dependencies=[Depends(conditional())])
 async def get_subtag_endpoint(
     subtag_id: int,
     db: AsyncSession = Depends(get_async_db),
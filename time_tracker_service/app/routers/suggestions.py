@@ -0,0 +1,27 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.db_vitals import get_async_db
+from app.schemas.suggestions import Suggestions
+from app.utils.auth import get_current_user_id
+from app.utils.http import conditional
+from app.utils.suggestions import get_suggestion_index
+from app.config.settings import settings
+
+router = APIRouter(prefix="/suggestions", tags=["suggestions"])
+
+# Rankings decay with time, validators expire with the in-memory index
+@router.get(
+    "",
+    response_model=Suggestions,
+    dependencies=[Depends(conditional(period=settings.SUGGESTIONS_INDEX_TTL))]
+)
+async def get_suggestions_endpoint(
+    prefix: str = Query("", max_length=200),
+    limit: int = Query(5, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    index = await get_suggestion_index(db, current_user_id)
+    return index.suggest(prefix, limit, datetime.utcnow())
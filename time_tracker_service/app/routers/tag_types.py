@@ -1,6 +1,5 @@
-from typing import List
+from typing import Dict, List
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.db_vitals import get_async_db
@@ -11,29 +10,16 @@ from app.db.crud.tag_types import (
     update_tag_type,
     delete_tag_type
 )
+from app.db.crud.deletions import count_activities, tag_type_activities
 from app.schemas.tag_types import TagTypeCreate, TagTypeUpdate, TagTypeResponse
-from app.utils.auth import verify_token
+from app.schemas.reports import ReportJobResponse
+from app.utils.auth import get_current_user_id
+from app.utils.jobs import accepted_job
+from app.utils.http import conditional, refresh_data_version
+from app.utils.responses import model_response
 from app.config.settings import settings
 
-router = APIRouter(prefix="/tag-types", tags=["tag-types"])
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
-
-async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    payload = verify_token(token)
-    if not payload or payload.get("type") != "access":
-        raise credentials_exception
-    
-    user_id = payload.get("sub")
-    if not user_id:
-        raise credentials_exception
-    
-    return int(user_id)
+router = APIRouter(prefix="/tag-types", tags=["tag-types"], dependencies=[Depends(refresh_data_version)])
 
 @router.post("", response_model=TagTypeResponse, status_code=status.HTTP_201_CREATED)
 async def create_tag_type_endpoint(
@@ -45,12 +31,15 @@ async def create_tag_type_endpoint(
 
 @router.get("", response_model=List[TagTypeResponse])
 async def get_tag_types(
+    validators: Dict[str, str] = Depends(conditional()),
     db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
-    return await get_user_tag_types(db, current_user_id)
+    return model_response(
+        List[TagTypeResponse], await get_user_tag_types(db, current_user_id), headers=validators
+    )
 
-@router.get("/{tag_type_id}", response_model=TagTypeResponse)
+@router.get("/{tag_type_id}", response_model=TagTypeResponse, dependencies=[Depends(conditional())])
 async def get_tag_type_endpoint(
     tag_type_id: int,
     db: AsyncSession = Depends(get_async_db),
@@ -79,12 +68,17 @@ async def update_tag_type_endpoint(
         )
     return tag_type
 
-@router.delete("/{tag_type_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{tag_type_id}", status_code=status.HTTP_204_NO_CONTENT, responses={202: {"model": ReportJobResponse, "description": "Deletion continues as a background job"}})
 async def delete_tag_type_endpoint(
     tag_type_id: int,
     db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
+    # Types with many activities are emptied in chunks in the background
+    condition = tag_type_activities(current_user_id, tag_type_id)
+    if await count_activities(db, condition) > settings.DELETE_INLINE_MAX_ROWS:
+        return await accepted_job(db, current_user_id, "delete_tag_type", {"tag_type_id": tag_type_id})
+
     deleted = await delete_tag_type(db, tag_type_id, current_user_id)
     if not deleted:
         raise HTTPException(
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -10,10 +10,17 @@ from app.db.crud.tags import (
     update_tag,
     delete_tag
 )
+from app.config.settings import settings
+from app.db.crud.deletions import count_activities, tag_activities
 from app.schemas.tags import TagCreate, TagUpdate, TagResponse
-from app.routers.tag_types import get_current_user_id
+from app.schemas.reports import ReportJobResponse
+from app.utils.auth import get_current_user_id
+from app.utils.jobs import accepted_job
+from app.utils.fields import Fields, fields_param, sparse_model
+from app.utils.http import conditional, refresh_data_version
+from app.utils.responses import model_response
 
-router = APIRouter(prefix="/tags", tags=["tags"])
+router = APIRouter(prefix="/tags", tags=["tags"], dependencies=[Depends(refresh_data_version)])
 
 @router.post("", response_model=TagResponse, status_code=status.HTTP_201_CREATED)
 async def create_tag_endpoint(
@@ -31,12 +38,18 @@ async def create_tag_endpoint(
 
 @router.get("", response_model=List[TagResponse])
 async def get_tags(
+    fields: Fields = Depends(fields_param(TagResponse)),
+    validators: Dict[str, str] = Depends(conditional()),
     db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
-    return await get_user_tags(db, current_user_id)
+    return model_response(
+        List[sparse_model(TagResponse, fields)],
+        await get_user_tags(db, current_user_id, fields),
+        headers=validators
+    )
 
-@router.get("/{tag_id}", response_model=TagResponse)
+@router.get("/{tag_id}", response_model=TagResponse, dependencies=[Depends(conditional())])
 async def get_tag_endpoint(
     tag_id: int,
     db: AsyncSession = Depends(get_async_db),
@@ -71,12 +84,17 @@ async def update_tag_endpoint(
             detail=str(e)
         )
 
-@router.delete("/{tag_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{tag_id}", status_code=status.HTTP_204_NO_CONTENT, responses={202: {"model": ReportJobResponse, "description": "Deletion continues as a background job"}})
 async def delete_tag_endpoint(
     tag_id: int,
     db: AsyncSession = Depends(get_async_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
+    # Tags with many activities are emptied in chunks in the background
+    condition = tag_activities(current_user_id, tag_id)
+    if await count_activities(db, condition) > settings.DELETE_INLINE_MAX_ROWS:
+        return await accepted_job(db, current_user_id, "delete_tag", {"tag_id": tag_id})
+
     deleted = await delete_tag(db, tag_id, current_user_id)
     if not deleted:
         raise HTTPException(
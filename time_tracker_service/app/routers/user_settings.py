@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.db_vitals import get_async_db
+from app.db.crud.user_settings import get_user_settings, update_user_settings
+from app.schemas.user_settings import UserSettingsUpdate, UserSettingsResponse
+from app.schemas.reports import ReportJobResponse
+from app.utils.auth import get_current_user_id
+from app.utils.http import conditional, refresh_data_version
+from app.utils.jobs import accepted_job
+
+router = APIRouter(prefix="/settings", tags=["settings"], dependencies=[Depends(refresh_data_version)])
+
+@router.get("", response_model=UserSettingsResponse, dependencies=[Depends(conditional())])
+async def get_settings_endpoint(
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    return await get_user_settings(db, current_user_id)
+
+@router.put("", response_model=UserSettingsResponse)
+async def update_settings_endpoint(
+    settings_update: UserSettingsUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    return await update_user_settings(db, current_user_id, settings_update)
+
+@router.delete("/data", status_code=status.HTTP_202_ACCEPTED, response_model=ReportJobResponse)
+async def delete_user_data_endpoint(
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    return await accepted_job(db, current_user_id, "delete_user_data", {})
@@ -1,7 +1,8 @@
-from typing import Optional
-from datetime import datetime
-from pydantic import BaseModel, validator
+from typing import List, Literal, Optional
+from datetime import date, datetime
+from pydantic import BaseModel, Field, validator
 from app.db.models import Tag, Subtag
+from app.utils.timezones import naive_utc
 
 class ActivityBase(BaseModel):
     name: str
@@ -17,6 +18,8 @@ class ActivityUpdate(BaseModel):
     description: Optional[str] = None
     tag_id: Optional[int] = None
     subtag_id: Optional[int] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
 
 class ActivityInDB(ActivityBase):
     id: int
@@ -30,13 +33,27 @@ class ActivityInDB(ActivityBase):
 class ActivityResponse(ActivityInDB):
     pass
 
+class ActivityOverlap(BaseModel):
+    activity_id: int
+    other_activity_id: int
+    overlap_start: datetime
+    overlap_end: Optional[datetime] = None
+
+class ActivitySearchHit(ActivityResponse):
+    rank: float
+
+class ActivitySearchPage(BaseModel):
+    items: List[ActivitySearchHit]
+    next_cursor: Optional[str] = None
+
 class TimeRange(BaseModel):
     start: datetime
     end: datetime
 
     @validator('end')
     def end_must_be_after_start(cls, v, values):
-        if 'start' in values and v <= values['start']:
+        # Compared in UTC, start and end may mix aware and naive values
+        if 'start' in values and naive_utc(v) <= naive_utc(values['start']):
             raise ValueError('end time must be after start time')
         return v
 
@@ -56,16 +73,64 @@ class TagTypeStats(BaseModel):
     tag_type_name: str
     average_duration_minutes: float
 
-class DailyStats(BaseModel):
+class PeriodStats(BaseModel):
     by_tags: list[TagStats]
     by_subtags: list[SubtagStats]
     by_tag_types: list[TagTypeStats]
 
-class WeeklyStats(BaseModel):
-    by_tags: list[TagStats]
-    by_subtags: list[SubtagStats]
-    by_tag_types: list[TagTypeStats]
+class TimelineSeries(BaseModel):
+    tag_id: int
+    minutes: List[int]
+
+class Timeline(BaseModel):
+    start: datetime
+    timezone: str
+    bucket_minutes: int
+    buckets: int
+    series: List[TimelineSeries]
+
+class Heatmap(BaseModel):
+    year: int
+    start: date
+    minutes: List[int]
 
-class ActivityStats(BaseModel):
-    daily: DailyStats
-    weekly: WeeklyStats 
\ No newline at end of file
+class HourOfWeekMatrix(BaseModel):
+    tag_id: int
+    # minutes[weekday][hour], Monday first, in the user's time zone
+    minutes: List[List[int]]
+
+class HourOfWeekStats(BaseModel):
+    timezone: str
+    tags: List[HourOfWeekMatrix]
+
+class StatsComparisonRequest(BaseModel):
+    # Chronological order, each range is compared to the one before it
+    ranges: List[TimeRange] = Field(..., min_length=1, max_length=12)
+    group_by: Literal['tag', 'subtag', 'tag_type'] = 'tag'
+    top_n: int = Field(5, ge=1, le=100)
+
+class RankedItem(BaseModel):
+    id: int
+    name: str
+    minutes: float
+    rank: int
+    previous_minutes: Optional[float] = None
+    delta_minutes: Optional[float] = None
+
+class RangeComparison(BaseModel):
+    start: datetime
+    end: datetime
+    total_minutes: float
+    items: List[RankedItem]
+
+class StatsComparison(BaseModel):
+    group_by: str
+    ranges: List[RangeComparison]
+
+class TagMetricsResponse(BaseModel):
+    tag_id: int
+    current_streak_days: int
+    longest_streak_days: int
+    last_active_day: date
+    rolling_7d_average_minutes: float
+    rolling_30d_average_minutes: float
@@ -0,0 +1,27 @@
+from typing import List, Optional
+from datetime import date
+from pydantic import BaseModel
+from app.schemas.activities import ActivityResponse
+from app.schemas.subtags import SubtagResponse
+from app.schemas.tag_types import TagTypeResponse
+from app.schemas.tags import TagResponse
+
+class TagPeriodTotals(BaseModel):
+    tag_id: int
+    today_minutes: float
+    week_minutes: float
+
+class Taxonomy(BaseModel):
+    tag_types: List[TagTypeResponse]
+    tags: List[TagResponse]
+    subtags: List[SubtagResponse]
+
+class Dashboard(BaseModel):
+    today: date
+    week_start: date
+    running: Optional[ActivityResponse] = None
+    today_minutes: float
+    week_minutes: float
+    totals: List[TagPeriodTotals]
+    recent: List[ActivityResponse]
+    taxonomy: Taxonomy
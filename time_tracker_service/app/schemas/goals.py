@@ -0,0 +1,36 @@
+from datetime import date
+from typing import Literal, Optional
+from pydantic import BaseModel, Field, validator
+
+class GoalBase(BaseModel):
+    tag_id: Optional[int] = None
+    tag_type_id: Optional[int] = None
+    period: Literal['day', 'week']
+    target_minutes: float = Field(..., gt=0)
+
+class GoalCreate(GoalBase):
+    @validator('tag_type_id', always=True)
+    def tag_or_tag_type(cls, v, values):
+        if (values.get('tag_id') is None) == (v is None):
+            raise ValueError('exactly one of tag_id and tag_type_id must be set')
+        return v
+
+class GoalUpdate(BaseModel):
+    period: Optional[Literal['day', 'week']] = None
+    target_minutes: Optional[float] = Field(None, gt=0)
+
+class GoalInDB(GoalBase):
+    id: int
+    user_id: int
+
+    class Config:
+        from_attributes = True
+
+class GoalResponse(GoalInDB):
+    pass
+
+class GoalProgress(GoalResponse):
+    period_start: date
+    progress_minutes: float
+    progress_ratio: float
+    completed: bool
@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+from pydantic import BaseModel, validator
+from app.utils.stats import parse_granularity
+
+class ReportCreate(BaseModel):
+    kind: Literal['stats', 'export']
+    start: datetime
+    end: datetime
+    # Used by stats reports only
+    granularity: List[str] = ['day', 'week']
+    # Used by exports only, columnar is the format of app.utils.columnar
+    format: Literal['csv', 'columnar'] = 'csv'
+
+    @validator('end')
+    def end_must_be_after_start(cls, v, values):
+        if 'start' in values and v <= values['start']:
+            raise ValueError('end time must be after start time')
+        return v
+
+    @validator('granularity')
+    def granularity_must_be_known(cls, v):
+        return list(dict.fromkeys(parse_granularity(value) for value in v))
+
+class ReportJobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    params: dict
+    error: Optional[str] = None
+    progress: int = 0
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,5 @@
+from pydantic import BaseModel
+
+class RevocationNotice(BaseModel):
+    # Token of type "revocation" signed by the auth service with the shared SECRET_KEY
+    token: str
@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+class NameSuggestion(BaseModel):
+    name: str
+    score: float
+    last_used: datetime
+
+class TagSuggestion(BaseModel):
+    tag_id: int
+    subtag_id: Optional[int] = None
+    score: float
+    last_used: datetime
+
+class Suggestions(BaseModel):
+    names: List[NameSuggestion]
+    tags: List[TagSuggestion]
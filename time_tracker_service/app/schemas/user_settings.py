@@ -0,0 +1,18 @@
+from pydantic import BaseModel, validator
+from app.utils.timezones import validate_timezone
+
+class UserSettingsBase(BaseModel):
+    timezone: str = "UTC"
+
+    @validator('timezone')
+    def timezone_must_exist(cls, v):
+        return validate_timezone(v)
+
+class UserSettingsUpdate(UserSettingsBase):
+    pass
+
+class UserSettingsResponse(UserSettingsBase):
+    user_id: int
+
+    class Config:
+        from_attributes = True
@@ -1,6 +1,50 @@
-from typing import Optional
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from app.config.settings import settings
+from app.utils.revocations import deny_list
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+
+
+class ClaimsCache:
+    """Claims of verified tokens by SHA-256 of the token, LRU bounded.
+
+    Clients reuse an access token for hours, so most requests skip the HMAC
+    check and claim parsing. Entries are dropped once the token's exp passes,
+    tokens without exp and invalid tokens are never cached.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        key = hashlib.sha256(token.encode()).digest()
+        entry = self.entries.get(key)
+        if entry is not None:
+            claims, expires = entry
+            if expires > time.time():
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return claims
+            del self.entries[key]
+        self.misses += 1
+        claims = verify_token(token)
+        if claims is not None and isinstance(claims.get("exp"), (int, float)):
+            self.entries[key] = (claims, claims["exp"])
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return claims
+
+    def metrics(self) -> dict:
+        return {"size": len(self.entries), "hits": self.hits, "misses": self.misses}
 
 def verify_token(token: str) -> Optional[dict]:
     try:
@@ -11,4 +55,26 @@ def verify_token(token: str) -> Optional[dict]:
         )
         return payload
     except JWTError:
-        return None 
\ No newline at end of file
+        return None
+
+claims_cache = ClaimsCache(settings.AUTH_CLAIMS_CACHE_SIZE)
+
+async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    payload = claims_cache.get(token)
+    if not payload or payload.get("type") != "access":
+        raise credentials_exception
+    
+    user_id = payload.get("sub")
+    if not user_id:
+        raise credentials_exception
+
+    if deny_list.is_revoked(int(user_id), payload.get("iat")):
+        raise credentials_exception
+    
+    return int(user_id)
@@ -0,0 +1,99 @@
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic_core import to_json
+
+# Opt-in with `Accept: application/vnd.chronary.columnar+json`
+COLUMNAR_MEDIA_TYPE = 'application/vnd.chronary.columnar+json'
+
+# Columns of the activity tuples fed to ActivityColumns, in order
+ACTIVITY_COLUMNS = ('id', 'name', 'description', 'tag_id', 'subtag_id', 'start', 'end')
+DICTIONARY_COLUMNS = ('name', 'description')
+TIME_COLUMNS = ('start', 'end')
+
+
+def wants_columnar(request: Request) -> bool:
+    """True if the Accept header lists the columnar media type with a non-zero q"""
+    for item in request.headers.get('accept', '').split(','):
+        media_type, *params = item.split(';')
+        if media_type.strip().lower() != COLUMNAR_MEDIA_TYPE:
+            continue
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def epoch_ms(value: Optional[datetime]) -> Optional[int]:
+    if value is None:
+        return None
+    return int(value.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+class ActivityColumns:
+    """Activities as one array per column instead of one object per row.
+
+    names picks a subset of ACTIVITY_COLUMNS. user_id is never included as it
+    is always the caller, times are epoch milliseconds (UTC) and names and
+    descriptions are indexes into per-column dictionaries of distinct values.
+    Rows can be added in batches, e.g. while streaming an export.
+    """
+
+    def __init__(self, names: Tuple[str, ...] = ACTIVITY_COLUMNS):
+        self.names = tuple(name for name in ACTIVITY_COLUMNS if name in names)
+        self.columns = {name: [] for name in self.names}
+        self.dictionaries = {name: [] for name in DICTIONARY_COLUMNS if name in self.names}
+        self._codes = {name: {} for name in self.dictionaries}
+        self.count = 0
+
+    def _encode(self, column: str, value) -> Optional[int]:
+        if value is None:
+            return None
+        codes = self._codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+            self.dictionaries[column].append(value)
+        return code
+
+    def add(self, rows: Iterable[tuple]):
+        columns = [self.columns[name] for name in self.names]
+        for row in rows:
+            for name, column, value in zip(self.names, columns, row):
+                if name in DICTIONARY_COLUMNS:
+                    value = self._encode(name, value)
+                elif name in TIME_COLUMNS:
+                    value = epoch_ms(value)
+                column.append(value)
+            self.count += 1
+
+    def add_activities(self, activities: Iterable):
+        self.add(tuple(getattr(activity, name) for name in self.names) for activity in activities)
+
+    def payload(self) -> dict:
+        return {
+            'count': self.count,
+            'time_unit': 'ms',
+            'columns': self.columns,
+            'dictionaries': self.dictionaries,
+        }
+
+
+def columnar_response(
+    activities: Iterable,
+    names: Tuple[str, ...] = ACTIVITY_COLUMNS,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    columns = ActivityColumns(names)
+    columns.add_activities(activities)
+    return Response(
+        content=to_json(columns.payload()),
+        media_type=COLUMNAR_MEDIA_TYPE,
+        headers={'Vary': 'Accept', **(headers or {})}
+    )
@@ -0,0 +1,265 @@
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.settings import settings
+
+# Optional encoders, gzip is always offered
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Bodies this large are compressed in a thread so the event loop keeps serving
+THREAD_MIN_SIZE = 256 * 1024
+
+_metrics = {
+    'responses': 0,
+    'bytes_in': 0,
+    'bytes_out': 0,
+    'cache_hits': 0,
+    'cache_misses': 0,
+}
+
+
+class _BrotliStream:
+    """brotli.Compressor behind the compress()/flush() interface of zlib"""
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def available_encoders() -> Dict[str, Callable]:
+    """Compressor factories by content coding, in order of preference"""
+    encoders = {}
+    if zstandard is not None:
+        encoders['zstd'] = lambda: zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compressobj()
+    if brotli is not None:
+        encoders['br'] = lambda: _BrotliStream(settings.COMPRESSION_BROTLI_QUALITY)
+    encoders['gzip'] = lambda: zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return encoders
+
+
+def compress(factory: Callable, data: bytes) -> bytes:
+    compressor = factory()
+    return compressor.compress(data) + compressor.flush()
+
+
+def negotiate(accept_encoding: str, available) -> Optional[str]:
+    """Coding to use for an Accept-Encoding header: highest q-value, ties go to
+    the server's preference. None when the client accepts none of them."""
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = qualities.get(coding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def weaken_etag(headers: MutableHeaders):
+    """A strong ETag promises byte-identical bodies, an encoded body is not
+    the one it was computed for. If-None-Match is compared weakly, so the W/
+    form still validates."""
+    etag = headers.get('etag')
+    if etag and not etag.startswith('W/'):
+        headers['ETag'] = f'W/{etag}'
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(';')[0].strip().lower()
+    return media_type.startswith('text/') or media_type == 'application/json' or media_type.endswith('+json')
+
+
+class CompressedCache:
+    """Compressed bodies of responses carrying a strong ETag, LRU bounded by size.
+
+    Entries are keyed by the ETag, media type and a digest of the body, so
+    repeated payloads are compressed once per coding. The digest keeps a hit
+    exact even when an endpoint reuses a tag for different bodies, and costs
+    far less than compressing again.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: "OrderedDict[Tuple, bytes]" = OrderedDict()
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        body = self.entries.get(key)
+        if body is None:
+            _metrics['cache_misses'] += 1
+            return None
+        _metrics['cache_hits'] += 1
+        self.entries.move_to_end(key)
+        return body
+
+    def put(self, key: Tuple, body: bytes):
+        if key in self.entries or len(body) > self.max_bytes // 4:
+            return
+        self.entries[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class CompressionMiddleware:
+    """Compress JSON, text and CSV responses with the best coding the client accepts.
+
+    Bodies under minimum_size are sent as is. Single-message responses with a
+    strong ETag go through the compressed cache, streamed ones (report downloads)
+    are compressed chunk by chunk. Encoded responses get their ETag weakened,
+    and so do 304s when the client accepts an encoding, since the 304 stands
+    for the encoded body. Partial and already encoded responses are left
+    alone. zstd and br are only offered when the optional `zstandard` and
+    `brotli` packages are installed.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = None, cache_bytes: int = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.encoders = available_encoders()
+        self.cache = CompressedCache(settings.COMPRESSION_CACHE_BYTES if cache_bytes is None else cache_bytes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate(Headers(scope=scope).get('accept-encoding', ''), self.encoders)
+        await _Responder(self, coding, send).run(scope, receive)
+
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, coding: Optional[str], send: Send):
+        self.middleware = middleware
+        self.coding = coding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def run(self, scope: Scope, receive: Receive):
+        await self.middleware.app(scope, receive, self.send_wrapper)
+
+    def _eligible(self, headers: MutableHeaders) -> bool:
+        if self.start['status'] != 200 or 'content-encoding' in headers or 'content-range' in headers:
+            return False
+        if 'no-transform' in headers.get('cache-control', '').lower():
+            return False
+        if not is_compressible(headers.get('content-type', '')):
+            return False
+        headers.add_vary_header('Accept-Encoding')
+        if self.coding is None:
+            return False
+        length = headers.get('content-length')
+        return length is None or int(length) >= self.middleware.minimum_size
+
+    async def send_wrapper(self, message: Message):
+        if message['type'] == 'http.response.start':
+            if message['status'] == 304:
+                headers = MutableHeaders(scope=message)
+                headers.add_vary_header('Accept-Encoding')
+                if self.coding is not None:
+                    weaken_etag(headers)
+                self.passthrough = True
+                await self.send(message)
+                return
+            self.start = message
+            return
+        if self.passthrough or message['type'] != 'http.response.body':
+            await self.send(message)
+            return
+
+        if self.compressor is None:
+            headers = MutableHeaders(scope=self.start)
+            if not self._eligible(headers):
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+            if not message.get('more_body', False):
+                await self._send_whole(headers, message.get('body', b''))
+                return
+            del headers['content-length']
+            headers['Content-Encoding'] = self.coding
+            weaken_etag(headers)
+            self.compressor = self.middleware.encoders[self.coding]()
+            await self.send(self.start)
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.flush()
+        _metrics['bytes_in'] += len(body)
+        _metrics['bytes_out'] += len(chunk)
+        if not more_body:
+            _metrics['responses'] += 1
+        await self.send({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
+
+    async def _send_whole(self, headers: MutableHeaders, body: bytes):
+        if len(body) < self.middleware.minimum_size:
+            await self.send(self.start)
+            await self.send({'type': 'http.response.body', 'body': body})
+            return
+
+        etag = headers.get('etag')
+        key = None
+        compressed = None
+        if etag and not etag.startswith('W/'):
+            digest = hashlib.blake2b(body, digest_size=16).digest()
+            key = (etag, headers.get('content-type'), digest, self.coding)
+            compressed = self.middleware.cache.get(key)
+        if compressed is None:
+            factory = self.middleware.encoders[self.coding]
+            if len(body) >= THREAD_MIN_SIZE:
+                compressed = await run_in_threadpool(compress, factory, body)
+            else:
+                compressed = compress(factory, body)
+            if key is not None:
+                self.middleware.cache.put(key, compressed)
+
+        headers['Content-Encoding'] = self.coding
+        headers['Content-Length'] = str(len(compressed))
+        weaken_etag(headers)
+        _metrics['responses'] += 1
+        _metrics['bytes_in'] += len(body)
+        _metrics['bytes_out'] += len(compressed)
+        await self.send(self.start)
+        await self.send({'type': 'http.response.body', 'body': compressed})
+
+
+def compression_metrics() -> dict:
+    return dict(_metrics)
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.db.crud.data_versions import get_data_version
+from app.utils.notifications import listener
+
+CHANNEL = 'user_data_version'
+
+
+class DataVersionCache:
+    """Latest data version per user, kept current by LISTENing to the NOTIFYs
+    the bump_user_data_versions() trigger sends on every write.
+
+    Cached versions are only trusted while the listener connection is up, so a
+    missed notification can never produce a stale 304: while disconnected every
+    lookup reads the database, and the cache starts empty after a reconnect.
+    """
+
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        self.versions: "OrderedDict[int, int]" = OrderedDict()
+        self.listening = False
+        # Bumped on every (re)connect, reads started before it are not cached
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        listener.subscribe(CHANNEL, self._on_notify, self._on_connect, self._on_disconnect)
+
+    def _remember(self, user_id: int, version: int):
+        # A notification can overtake a slower database read, never go back
+        self.versions[user_id] = max(version, self.versions.get(user_id, version))
+        self.versions.move_to_end(user_id)
+        while len(self.versions) > self.max_users:
+            self.versions.popitem(last=False)
+
+    async def get(self, db: AsyncSession, user_id: int) -> int:
+        if self.listening:
+            version = self.versions.get(user_id)
+            if version is not None:
+                self.hits += 1
+                self.versions.move_to_end(user_id)
+                return version
+        self.misses += 1
+        generation, listening = self.generation, self.listening
+        version = await get_data_version(db, user_id)
+        if listening and self.listening and generation == self.generation:
+            self._remember(user_id, version)
+        return version
+
+    async def refresh(self, db: AsyncSession, user_id: int):
+        """Read the version again after this worker committed a write of the user.
+
+        The write's notification may still be on its way, until then the cached
+        version is stale and would answer the writer's next GET with a 304.
+        """
+        generation, listening = self.generation, self.listening
+        version = await get_data_version(db, user_id)
+        if listening and self.listening and generation == self.generation:
+            self._remember(user_id, version)
+        else:
+            self.versions.pop(user_id, None)
+
+    def _on_notify(self, payload: str):
+        for item in payload.split(','):
+            user_id, _, version = item.partition(':')
+            self._remember(int(user_id), int(version))
+
+    async def _on_connect(self):
+        self.generation += 1
+        self.versions.clear()
+        self.listening = True
+
+    def _on_disconnect(self):
+        self.listening = False
+
+    def metrics(self) -> dict:
+        return {
+            'listening': self.listening,
+            'users': len(self.versions),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+data_versions = DataVersionCache(settings.DATA_VERSION_MAX_USERS)
@@ -0,0 +1,43 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Optional
+
+from app.config.logging import logger
+from app.config.settings import settings
+
+_executor: Optional[ProcessPoolExecutor] = None
+_pending: Optional[asyncio.Semaphore] = None
+
+
+def get_stats_executor() -> ProcessPoolExecutor:
+    global _executor, _pending
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.STATS_PROCESS_POOL_WORKERS)
+        _pending = asyncio.Semaphore(settings.STATS_PROCESS_POOL_MAX_PENDING)
+        logger.info(f'Stats process pool started with {settings.STATS_PROCESS_POOL_WORKERS} workers')
+    return _executor
+
+
+async def run_cpu_bound(func: Callable, *args, size: int):
+    """Run func(*args) in the stats process pool if size reaches the threshold.
+
+    Small inputs are computed inline since pickling them costs more than the work
+    itself. Submissions are bounded, so a burst of large requests waits here
+    instead of piling up in the executor queue.
+    """
+    if settings.STATS_PROCESS_POOL_WORKERS <= 0 or size < settings.STATS_PROCESS_POOL_THRESHOLD:
+        return func(*args)
+
+    executor = get_stats_executor()
+    async with _pending:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(func, *args))
+
+
+def shutdown_stats_executor():
+    global _executor, _pending
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _pending = None
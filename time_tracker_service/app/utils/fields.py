@@ -0,0 +1,64 @@
+from functools import lru_cache
+from typing import Optional, Tuple, Type
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, create_model
+from sqlalchemy import select
+
+Fields = Optional[Tuple[str, ...]]
+
+
+def parse_fields(value: Optional[str], schema: Type[BaseModel]) -> Fields:
+    """Field names of a `fields=a,b,c` parameter in schema order, None for all fields"""
+    if not value:
+        return None
+    requested = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = requested - set(schema.model_fields)
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. "
+            f"Available: {', '.join(schema.model_fields)}"
+        )
+    return tuple(name for name in schema.model_fields if name in requested) or None
+
+
+def fields_param(schema: Type[BaseModel]):
+    """Dependency reading a `fields` query parameter checked against schema"""
+    def dependency(
+        fields: Optional[str] = Query(
+            None, description=f"comma separated {schema.__name__} fields, all by default"
+        )
+    ) -> Fields:
+        try:
+            return parse_fields(fields, schema)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    return dependency
+
+
+@lru_cache(maxsize=None)
+def sparse_model(schema: Type[BaseModel], fields: Fields) -> Type[BaseModel]:
+    """schema restricted to fields, built once per combination"""
+    if fields is None:
+        return schema
+    return create_model(
+        f'{schema.__name__}Fields',
+        __config__=schema.model_config,
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields}
+    )
+
+
+def select_fields(model, fields: Fields):
+    """SELECT of whole ORM objects, or of the columns named by fields only"""
+    if fields is None:
+        return select(model)
+    return select(*(getattr(model, name) for name in fields))
+
+
+async def fetch_fields(db, stmt, fields: Fields) -> list:
+    """Rows of a select_fields() statement: ORM objects, or rows with one attribute per field"""
+    result = await db.execute(stmt)
+    return list(result.scalars().all() if fields is None else result.all())
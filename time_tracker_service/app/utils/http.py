@@ -0,0 +1,81 @@
+import hashlib
+import time
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.db_vitals import get_async_db
+from app.utils.auth import get_current_user_id
+from app.utils.data_versions import data_versions
+from app.utils.timezones import naive_utc
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Weak comparison as If-None-Match asks for, proxies may have marked the tag W/"""
+    if_none_match = request.headers.get('if-none-match')
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return etag in (tag.strip().removeprefix('W/') for tag in if_none_match.split(','))
+
+
+def _ends_in_past(request: Request) -> bool:
+    end = request.query_params.get('end')
+    if not end:
+        return False
+    try:
+        return naive_utc(datetime.fromisoformat(end.replace('Z', '+00:00'))) <= datetime.utcnow()
+    except ValueError:
+        return False
+
+
+SAFE_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+async def refresh_data_version(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Router dependency bringing the caller's cached data version up to date
+    once a successful write request is done, before its response is sent"""
+    yield
+    if request.method not in SAFE_METHODS:
+        await data_versions.refresh(db, current_user_id)
+
+
+def conditional(period: Optional[int] = None):
+    """Dependency setting an ETag derived from the caller's data version, and
+    answering a matching If-None-Match with 304 before the endpoint runs.
+
+    The tag covers the path, query, Accept header and any request body (older
+    clients still send ranges in the body of a GET), so every representation
+    gets its own. period is for results that also move with the clock (running
+    activities, "today"): validators then expire every period seconds, unless
+    an `end` query parameter puts the range entirely in the past. Endpoints
+    returning a Response themselves pass the returned headers on.
+    """
+    async def dependency(
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_async_db),
+        current_user_id: int = Depends(get_current_user_id)
+    ) -> dict:
+        version = await data_versions.get(db, current_user_id)
+        variant = [request.url.path, request.url.query, request.headers.get('accept', '')]
+        if period and not _ends_in_past(request):
+            variant.append(str(int(time.time() // period)))
+        digest = hashlib.blake2b('\n'.join(variant).encode(), digest_size=8)
+        body = await request.body()
+        if body:
+            digest.update(b'\n' + body)
+        etag = f'"{current_user_id}-{version}-{digest.hexdigest()}"'
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        if is_not_modified(request, etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return headers
+    return dependency
@@ -0,0 +1,292 @@
+import asyncio
+import csv
+import json
+import os
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+from sqlalchemy import select
+
+from app.config.logging import logger
+from app.config.settings import settings
+from app.db.db_vitals import async_session
+from app.db.models import Activity, ReportJob, Tag, Subtag
+from app.db.crud.activities import get_bucketed_stats
+from app.db.crud.deletions import (
+    delete_activities_in_chunks,
+    delete_user_data,
+    tag_activities,
+    tag_type_activities,
+    user_activities
+)
+from app.db.crud.report_jobs import (
+    claim_report_job,
+    create_report_job,
+    finish_report_job,
+    requeue_stale_report_jobs
+)
+from app.db.crud.tags import delete_tag
+from app.db.crud.tag_types import delete_tag_type
+from app.schemas.reports import ReportJobResponse
+from app.utils.columnar import ACTIVITY_COLUMNS, COLUMNAR_MEDIA_TYPE, ActivityColumns
+from app.utils.stats import stats_key
+from app.utils.timezones import naive_utc
+
+EXPORT_COLUMNS = (
+    'id', 'name', 'description', 'tag_id', 'tag_name',
+    'subtag_id', 'subtag_name', 'start', 'end'
+)
+
+
+def _result_path(job: ReportJob, extension: str) -> str:
+    return os.path.join(settings.REPORTS_DIR, f'{job.id}.{extension}')
+
+
+def _param_time(params: dict, name: str) -> datetime:
+    return naive_utc(datetime.fromisoformat(params[name]))
+
+
+def _write_json(path: str, payload: dict):
+    with open(path, 'w') as file:
+        json.dump(payload, file, default=str)
+
+
+def _write_bytes(path: str, content: bytes):
+    with open(path, 'wb') as file:
+        file.write(content)
+
+
+async def build_stats_report(db, job: ReportJob) -> str:
+    params = job.params
+    stats = await get_bucketed_stats(
+        db, job.user_id,
+        _param_time(params, 'start'),
+        _param_time(params, 'end'),
+        params['granularity']
+    )
+    path = _result_path(job, 'json')
+    await asyncio.to_thread(_write_json, path + '.part', {stats_key(name): result for name, result in stats.items()})
+    os.replace(path + '.part', path)
+    return path
+
+
+def _export_query(job: ReportJob, *columns):
+    params = job.params
+    return (
+        select(*columns)
+        .filter(
+            Activity.user_id == job.user_id,
+            Activity.start >= _param_time(params, 'start'),
+            Activity.start < _param_time(params, 'end')
+        )
+        .order_by(Activity.start)
+        .execution_options(yield_per=settings.REPORT_EXPORT_CHUNK_ROWS)
+    )
+
+
+async def build_export_report(db, job: ReportJob) -> str:
+    """Activities of the range as CSV or columnar JSON, streamed from the database in partitions"""
+    if job.params.get('format') == 'columnar':
+        return await build_columnar_export(db, job)
+
+    result = await db.stream(
+        _export_query(
+            job,
+            Activity.id, Activity.name, Activity.description, Activity.tag_id, Tag.name,
+            Activity.subtag_id, Subtag.name, Activity.start, Activity.end
+        )
+        .join(Tag, Tag.id == Activity.tag_id)
+        .outerjoin(Subtag, Subtag.id == Activity.subtag_id)
+    )
+    path = _result_path(job, 'csv')
+    with open(path + '.part', 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(EXPORT_COLUMNS)
+        async for rows in result.partitions():
+            await asyncio.to_thread(writer.writerows, rows)
+    os.replace(path + '.part', path)
+    return path
+
+
+async def build_columnar_export(db, job: ReportJob) -> str:
+    result = await db.stream(
+        _export_query(job, *(getattr(Activity, name) for name in ACTIVITY_COLUMNS))
+    )
+    columns = ActivityColumns()
+    async for rows in result.partitions():
+        columns.add(rows)
+    path = _result_path(job, 'json')
+    await asyncio.to_thread(_write_bytes, path + '.part', to_json(columns.payload()))
+    os.replace(path + '.part', path)
+    return path
+
+
+async def _delete_activities(db, job: ReportJob, condition):
+    await delete_activities_in_chunks(
+        db, job.id, condition, settings.DELETE_CHUNK_ROWS, settings.DELETE_CHUNK_PAUSE
+    )
+
+
+async def run_tag_deletion(db, job: ReportJob) -> None:
+    tag_id = job.params['tag_id']
+    await _delete_activities(db, job, tag_activities(job.user_id, tag_id))
+    await delete_tag(db, tag_id, job.user_id)
+
+
+async def run_tag_type_deletion(db, job: ReportJob) -> None:
+    tag_type_id = job.params['tag_type_id']
+    await _delete_activities(db, job, tag_type_activities(job.user_id, tag_type_id))
+    await delete_tag_type(db, tag_type_id, job.user_id)
+
+
+async def run_user_data_deletion(db, job: ReportJob) -> None:
+    await _delete_activities(db, job, user_activities(job.user_id))
+    await delete_user_data(db, job.user_id, job.id)
+
+
+# Jobs produce a result file, or None for jobs that only change data
+REPORT_BUILDERS = {
+    'stats': build_stats_report,
+    'export': build_export_report,
+    'delete_tag': run_tag_deletion,
+    'delete_tag_type': run_tag_type_deletion,
+    'delete_user_data': run_user_data_deletion,
+}
+
+# Media type of a result file by extension, columnar exports are the only .json exports
+MEDIA_TYPES = {
+    ('stats', '.json'): 'application/json',
+    ('export', '.csv'): 'text/csv',
+    ('export', '.json'): COLUMNAR_MEDIA_TYPE,
+}
+
+
+class InProcessQueue:
+    """Job ids handed to the workers of this process.
+
+    The report_jobs table stays the source of truth: a worker that finds the
+    queue empty for a poll interval claims any queued job from the table, so
+    jobs submitted to another process or left by a restart are not lost.
+    """
+
+    def __init__(self):
+        self._queue = asyncio.Queue()
+
+    async def put(self, job_id: int):
+        self._queue.put_nowait(job_id)
+
+    async def get(self) -> Optional[ReportJob]:
+        try:
+            job_id = await asyncio.wait_for(self._queue.get(), settings.REPORT_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            job_id = None
+        async with async_session() as db:
+            return await claim_report_job(db, job_id)
+
+
+class DatabaseQueue:
+    """Broker stand-in: workers poll report_jobs with SKIP LOCKED only.
+
+    Lets report building run in separate processes (scripts/report_worker.py)
+    while the API processes set REPORT_WORKERS=0 and only submit.
+    """
+
+    async def put(self, job_id: int):
+        pass  # The committed row is the message
+
+    async def get(self) -> Optional[ReportJob]:
+        async with async_session() as db:
+            job = await claim_report_job(db)
+        if job is None:
+            await asyncio.sleep(settings.REPORT_POLL_INTERVAL)
+        return job
+
+
+QUEUE_BACKENDS = {
+    'memory': InProcessQueue,
+    'database': DatabaseQueue,
+}
+
+_queue = None
+_workers: List[asyncio.Task] = []
+
+
+def get_report_queue():
+    global _queue
+    if _queue is None:
+        _queue = QUEUE_BACKENDS[settings.REPORT_QUEUE_BACKEND]()
+    return _queue
+
+
+async def submit_job(db, user_id: int, kind: str, params: dict) -> ReportJob:
+    """Persist a job and hand it to the workers. ValueError if the user has too many unfinished jobs"""
+    job = await create_report_job(db, user_id, kind, params, settings.REPORT_MAX_UNFINISHED_PER_USER)
+    await get_report_queue().put(job.id)
+    return job
+
+
+async def accepted_job(db, user_id: int, kind: str, params: dict) -> JSONResponse:
+    """202 with the job for endpoints that hand their work over to a job"""
+    try:
+        job = await submit_job(db, user_id, kind, params)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(ReportJobResponse.model_validate(job))
+    )
+
+
+async def run_report_job(job: ReportJob):
+    os.makedirs(settings.REPORTS_DIR, exist_ok=True)
+    async with async_session() as db:
+        try:
+            path = await REPORT_BUILDERS[job.kind](db, job)
+        except Exception as e:
+            logger.exception(f'Report job {job.id} failed')
+            await db.rollback()
+            await finish_report_job(db, job.id, error=str(e) or type(e).__name__)
+        else:
+            await finish_report_job(db, job.id, result_path=path)
+            logger.info(f'Report job {job.id} ({job.kind}) done')
+
+
+async def _worker(queue):
+    while True:
+        try:
+            job = await queue.get()
+            if job is not None:
+                await run_report_job(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Keep the worker alive through database hiccups
+            logger.exception('Report worker error')
+            await asyncio.sleep(settings.REPORT_POLL_INTERVAL)
+
+
+async def start_report_workers(count: int = None):
+    count = settings.REPORT_WORKERS if count is None else count
+    if count <= 0:
+        return
+    async with async_session() as db:
+        requeued = await requeue_stale_report_jobs(db, settings.REPORT_JOB_TIMEOUT)
+    if requeued:
+        logger.warning(f'Requeued {requeued} stale report jobs')
+    queue = get_report_queue()
+    _workers.extend(asyncio.create_task(_worker(queue)) for _ in range(count))
+    logger.info(f'Started {count} report workers ({settings.REPORT_QUEUE_BACKEND} queue)')
+
+
+async def stop_report_workers():
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
@@ -0,0 +1,91 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from asyncpg import connect
+
+from app.config.logging import logger
+from app.config.settings import settings
+
+
+class NotificationListener:
+    """The worker's single LISTEN connection, shared by the in-memory state kept
+    in sync through Postgres NOTIFY.
+
+    Subscribers get each payload of their channel, on_connect once the
+    connection listens again (notifications sent while it was down are lost,
+    so this is where state is reloaded or dropped) and on_disconnect when it
+    goes away. The connection is pinged so a dead one is noticed, and
+    reopened after NOTIFY_RECONNECT_DELAY.
+    """
+
+    def __init__(self):
+        self.handlers: Dict[str, Callable[[str], None]] = {}
+        self.on_connect: List[Callable[[], Awaitable]] = []
+        self.on_disconnect: List[Callable[[], None]] = []
+        self.connected = False
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(
+        self,
+        channel: str,
+        handler: Callable[[str], None],
+        on_connect: Callable[[], Awaitable] = None,
+        on_disconnect: Callable[[], None] = None
+    ):
+        self.handlers[channel] = handler
+        if on_connect:
+            self.on_connect.append(on_connect)
+        if on_disconnect:
+            self.on_disconnect.append(on_disconnect)
+
+    def _dispatch(self, connection, pid, channel, payload: str):
+        try:
+            self.handlers[channel](payload)
+        except Exception as e:
+            logger.warning(f'Bad {channel} notification {payload!r}: {e!r}')
+
+    async def _listen(self):
+        while True:
+            connection = None
+            try:
+                connection = await connect(
+                    user=settings.POSTGRES_USER,
+                    database=settings.POSTGRES_DB_NAME,
+                    password=settings.POSTGRES_PASSWORD,
+                    port=settings.POSTGRES_PORT,
+                    host=settings.POSTGRES_HOST
+                )
+                for channel in self.handlers:
+                    await connection.add_listener(channel, self._dispatch)
+                for hook in self.on_connect:
+                    await hook()
+                self.connected = True
+                logger.info(f'Listening for {", ".join(self.handlers)} notifications')
+                # Notifications arrive between queries, the ping also notices a dead connection
+                while True:
+                    await asyncio.sleep(settings.NOTIFY_PING_INTERVAL)
+                    await asyncio.wait_for(connection.fetchval('SELECT 1'), settings.NOTIFY_PING_INTERVAL)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f'Notification listener disconnected: {e!r}')
+            finally:
+                self.connected = False
+                for hook in self.on_disconnect:
+                    hook()
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+            await asyncio.sleep(settings.NOTIFY_RECONNECT_DELAY)
+
+    def start(self):
+        if self._task is None and self.handlers:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+listener = NotificationListener()
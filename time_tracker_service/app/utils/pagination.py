@@ -0,0 +1,20 @@
+import base64
+import json
+from typing import Callable
+
+
+def encode_cursor(*values) -> str:
+    """Opaque keyset cursor for the sort key of the last row of a page"""
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode()).decode()
+
+
+def decode_cursor(cursor: str, *types: Callable) -> list:
+    """Values of a cursor made by encode_cursor, converted by types. Anything
+    else a client sends raises ValueError('Invalid cursor')."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError('Invalid cursor')
+        return [convert(value) for convert, value in zip(types, values)]
+    except (ValueError, TypeError, OverflowError):
+        raise ValueError('Invalid cursor')
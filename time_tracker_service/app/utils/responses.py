@@ -0,0 +1,29 @@
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from fastapi import Response, status
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def type_adapter(response_type) -> TypeAdapter:
+    """Adapter with its validator and serializer built once per response type"""
+    return TypeAdapter(response_type)
+
+
+def model_response(
+    response_type,
+    content: Any,
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """JSON response for content (ORM objects or dicts) validated once against response_type.
+
+    Serialisation goes straight to JSON bytes through the compiled pydantic-core
+    serializer. Endpoints returning this bypass FastAPI's response_model pass,
+    which would validate the content, dump it to Python objects and json.dumps
+    those; response_model is still declared for the OpenAPI schema.
+    """
+    adapter = type_adapter(response_type)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
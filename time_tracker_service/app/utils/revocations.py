@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from app.config.logging import logger
+from app.config.settings import settings
+from app.db.db_vitals import async_session
+from app.db.crud.token_revocations import REVOCATION_CHANNEL, get_revocations_since
+from app.utils.notifications import listener
+from app.utils.timezones import epoch_seconds
+
+
+class DenyList:
+    """Per-user cutoffs pushed by the auth service on logout: access tokens of
+    the user issued at or before the cutoff are rejected.
+
+    A dict lookup per request, no network call. The worker receiving a push
+    records it and NOTIFYs the others, every worker reloads the cutoffs younger
+    than an access token's lifetime when its LISTEN connection (re)opens.
+    Cutoffs and iat carry microseconds, so a re-login right after the logout
+    is not caught by it. Tokens without iat predate the claim and are denied
+    once their user has a cutoff. A cutoff older than an access token's
+    lifetime denies nothing anymore and is dropped.
+    """
+
+    def __init__(self):
+        self.cutoffs: Dict[int, float] = {}
+        self.denied = 0
+        listener.subscribe(REVOCATION_CHANNEL, self._on_notify, self._reload)
+
+    def _prune(self):
+        oldest = epoch_seconds(datetime.utcnow()) - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        for user_id in [user_id for user_id, cutoff in self.cutoffs.items() if cutoff < oldest]:
+            del self.cutoffs[user_id]
+
+    def _remember(self, user_id: int, cutoff: float):
+        self.cutoffs[user_id] = max(cutoff, self.cutoffs.get(user_id, cutoff))
+
+    def add(self, user_id: int, cutoff: float):
+        self._prune()
+        self._remember(user_id, cutoff)
+
+    def is_revoked(self, user_id: int, issued_at: Optional[float]) -> bool:
+        cutoff = self.cutoffs.get(user_id)
+        if cutoff is None:
+            return False
+        if issued_at is None or issued_at <= cutoff:
+            self.denied += 1
+            return True
+        return False
+
+    def _on_notify(self, payload: str):
+        user_id, _, cutoff = payload.partition(':')
+        self.add(int(user_id), float(cutoff))
+
+    async def _reload(self):
+        since = datetime.utcnow() - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        async with async_session() as db:
+            revocations = await get_revocations_since(db, since)
+        self._prune()
+        for user_id, revoked_before in revocations:
+            self._remember(user_id, epoch_seconds(revoked_before))
+        logger.info(f'Loaded {len(revocations)} token revocations')
+
+    def metrics(self) -> dict:
+        return {'users': len(self.cutoffs), 'denied': self.denied}
+
+
+deny_list = DenyList()
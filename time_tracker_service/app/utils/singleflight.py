@@ -0,0 +1,48 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable
+
+from app.config.logging import logger
+
+_groups: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls within this worker process.
+
+    The first caller for a key runs the computation, callers arriving while it
+    is in flight await the same future and get the same result (or exception).
+    Nothing is cached: once the call finishes the next one for the key runs again.
+    The computation outlives the caller that started it, so it must not use
+    that request's resources (its database session in particular).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+        _groups[name] = self
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable]):
+        task = self.in_flight.get(key)
+        if task is None:
+            self.calls += 1
+            # A task, so a leader that disconnects does not cancel the followers
+            task = asyncio.ensure_future(func())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+            logger.debug(f'{self.name}: joined in-flight call for {key}')
+        return await asyncio.shield(task)
+
+    def metrics(self) -> dict:
+        return {
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+            'in_flight': len(self.in_flight),
+        }
+
+
+def singleflight_metrics() -> Dict[str, dict]:
+    return {name: group.metrics() for name, group in _groups.items()}
@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+GRANULARITIES = ('hour', 'day', 'week', 'month', 'year')
+
+# Response keys of the named granularities, N-day granularities are keyed as is
+STATS_KEYS = {
+    'hour': 'hourly',
+    'day': 'daily',
+    'week': 'weekly',
+    'month': 'monthly',
+    'year': 'yearly',
+}
+
+
+def parse_granularity(value: str) -> str:
+    """Normalise a granularity name, N-day granularities are written as '<N>d'"""
+    value = value.strip().lower()
+    if value in GRANULARITIES:
+        return value
+    if value.endswith('d') and value[:-1].isdigit() and int(value[:-1]) > 0:
+        return f'{int(value[:-1])}d'
+    raise ValueError(f"Unknown granularity '{value}', expected one of {', '.join(GRANULARITIES)} or <N>d")
+
+
+def stats_key(granularity: str) -> str:
+    return STATS_KEYS.get(granularity, granularity)
+
+
+def day_span(granularity: str) -> Optional[int]:
+    """Number of days in an N-day granularity, None for the named ones"""
+    return int(granularity[:-1]) if granularity.endswith('d') else None
+
+
+def truncate(value: datetime, granularity: str) -> datetime:
+    """Start of the bucket value falls in. N-day buckets are aligned to the day"""
+    if granularity == 'hour':
+        return value.replace(minute=0, second=0, microsecond=0)
+    value = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == 'week':
+        return value - timedelta(days=value.weekday())
+    if granularity == 'month':
+        return value.replace(day=1)
+    if granularity == 'year':
+        return value.replace(month=1, day=1)
+    return value
+
+
+def advance(value: datetime, granularity: str) -> datetime:
+    """Start of the bucket after the one starting at value"""
+    if granularity == 'hour':
+        return value + timedelta(hours=1)
+    if granularity == 'day':
+        return value + timedelta(days=1)
+    if granularity == 'week':
+        return value + timedelta(weeks=1)
+    if granularity == 'month':
+        if value.month == 12:
+            return value.replace(year=value.year + 1, month=1)
+        return value.replace(month=value.month + 1)
+    if granularity == 'year':
+        return value.replace(year=value.year + 1)
+    return value + timedelta(days=day_span(granularity))
+
+
+def bucket_window(granularity: str, start: datetime, end: datetime) -> Tuple[datetime, datetime]:
+    """Extend [start, end] to whole buckets, N-day buckets are counted from start's day"""
+    window_start = truncate(start, granularity)
+    span = day_span(granularity)
+    if span:
+        days = (end - window_start) // timedelta(days=1) + 1
+        return window_start, window_start + timedelta(days=-(-days // span) * span)
+    window_end = truncate(end, granularity)
+    return window_start, advance(window_end, granularity)
+
+
+def _summarise(names: tuple, tag_buckets: dict, subtag_buckets: dict,
+               tag_type_buckets: dict, subtag_tags: dict) -> dict:
+    tag_names, subtag_names, tag_type_names = names
+    return {
+        'by_tags': [
+            {
+                'tag_id': tag_id,
+                'tag_name': tag_names[tag_id],
+                'average_duration_minutes': sum(buckets.values()) / len(buckets)
+            }
+            for tag_id, buckets in tag_buckets.items()
+        ],
+        'by_subtags': [
+            {
+                'subtag_id': subtag_id,
+                'subtag_name': subtag_names[subtag_id],
+                'tag_id': subtag_tags[subtag_id],
+                'average_duration_minutes': sum(buckets.values()) / len(buckets)
+            }
+            for subtag_id, buckets in subtag_buckets.items()
+        ],
+        'by_tag_types': [
+            {
+                'tag_type_id': tag_type_id,
+                'tag_type_name': tag_type_names[tag_type_id],
+                'average_duration_minutes': sum(buckets.values()) / len(buckets)
+            }
+            for tag_type_id, buckets in tag_type_buckets.items()
+        ],
+    }
+
+
+def summarise_bucket_totals(rows: List[tuple], granularity_count: int) -> List[dict]:
+    """Average duration per tag, subtag and tag type over the buckets they occur in.
+
+    rows are (granularity index, bucket, tag_id, tag_name, tag_type, tag_type_name,
+    subtag_id, subtag_name, minutes) totals as grouped in SQL, the result has one
+    entry per granularity index. This is a pure function of its arguments so it
+    can run in a worker process.
+    """
+    aggregates = [({}, {}, {}, {}) for _ in range(granularity_count)]
+    names = ({}, {}, {})
+
+    for index, bucket, tag_id, tag_name, tag_type, tag_type_name, subtag_id, subtag_name, minutes in rows:
+        tag_buckets, subtag_buckets, tag_type_buckets, subtag_tags = aggregates[index]
+
+        buckets = tag_buckets.setdefault(tag_id, {})
+        buckets[bucket] = buckets.get(bucket, 0) + minutes
+        names[0][tag_id] = tag_name
+
+        if subtag_id:
+            buckets = subtag_buckets.setdefault(subtag_id, {})
+            buckets[bucket] = buckets.get(bucket, 0) + minutes
+            subtag_tags.setdefault(subtag_id, tag_id)
+            names[1][subtag_id] = subtag_name
+
+        if tag_type:
+            buckets = tag_type_buckets.setdefault(tag_type, {})
+            buckets[bucket] = buckets.get(bucket, 0) + minutes
+            names[2][tag_type] = tag_type_name
+
+    return [_summarise(names, *accumulators) for accumulators in aggregates]
@@ -0,0 +1,133 @@
+import asyncio
+import heapq
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.db.crud.activities import get_name_usage
+
+Pair = Tuple[int, Optional[int]]
+
+
+def _decay(seconds: float) -> float:
+    return 2 ** (-seconds / (settings.SUGGESTIONS_HALF_LIFE_DAYS * 86400))
+
+
+class DecayedCount:
+    """Use count where a use loses half its weight every half-life.
+
+    Stored relative to the last use, so recording a use is O(1) and the current
+    score is one multiplication.
+    """
+    __slots__ = ('value', 'last_used')
+
+    def __init__(self, value: float = 0.0, last_used: datetime = None):
+        self.value = value
+        self.last_used = last_used
+
+    def add(self, when: datetime, weight: float = 1.0):
+        if self.last_used is None or when >= self.last_used:
+            if self.last_used is not None:
+                self.value *= _decay((when - self.last_used).total_seconds())
+            self.value += weight
+            self.last_used = when
+        else:
+            self.value += weight * _decay((self.last_used - when).total_seconds())
+
+    def score(self, now: datetime) -> float:
+        return self.value * _decay(max((now - self.last_used).total_seconds(), 0))
+
+
+class SuggestionIndex:
+    """Activity names of one user, sorted by lower-cased name for prefix lookups,
+    with the (tag, subtag) pairs each name was used with"""
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.names: Dict[str, Tuple[str, datetime]] = {}
+        self.pairs: Dict[str, Dict[Pair, DecayedCount]] = {}
+        self.loaded_at = time.monotonic()
+
+    def add(self, name: str, pair: Pair, when: datetime, weight: float = 1.0):
+        key = name.strip().lower()
+        if not key:
+            return
+        if key not in self.pairs:
+            insort(self.keys, key)
+            self.pairs[key] = {}
+        counts = self.pairs[key]
+        counts.setdefault(pair, DecayedCount()).add(when, weight)
+        # Show the spelling used last
+        if key not in self.names or when >= self.names[key][1]:
+            self.names[key] = (name.strip(), when)
+
+    def suggest(self, prefix: str, limit: int, now: datetime) -> dict:
+        prefix = prefix.strip().lower()
+        low = bisect_left(self.keys, prefix)
+        high = bisect_left(self.keys, prefix + '\uffff') if prefix else len(self.keys)
+
+        name_scores = []
+        pair_scores: Dict[Pair, List] = {}
+        for key in self.keys[low:high]:
+            score, last_used = 0.0, None
+            for pair, count in self.pairs[key].items():
+                pair_score = count.score(now)
+                score += pair_score
+                last_used = max(last_used or count.last_used, count.last_used)
+                totals = pair_scores.setdefault(pair, [0.0, count.last_used])
+                totals[0] += pair_score
+                totals[1] = max(totals[1], count.last_used)
+            name_scores.append((score, self.names[key][0], last_used))
+
+        return {
+            'names': [
+                {'name': name, 'score': score, 'last_used': last_used}
+                for score, name, last_used in heapq.nlargest(limit, name_scores)
+            ],
+            'tags': [
+                {'tag_id': pair[0], 'subtag_id': pair[1], 'score': score, 'last_used': last_used}
+                for pair, (score, last_used) in heapq.nlargest(
+                    limit, pair_scores.items(), key=lambda item: item[1][0]
+                )
+            ],
+        }
+
+
+# Most recently used indexes first out, bounded by SUGGESTIONS_MAX_USERS
+_indexes: "OrderedDict[int, SuggestionIndex]" = OrderedDict()
+_loading: Dict[int, asyncio.Lock] = {}
+
+
+async def get_suggestion_index(db, user_id: int) -> SuggestionIndex:
+    """The user's index, built from one grouped query on first use or once it is
+    older than SUGGESTIONS_INDEX_TTL (other workers' writes show up then)"""
+    index = _indexes.get(user_id)
+    if index is not None and time.monotonic() - index.loaded_at < settings.SUGGESTIONS_INDEX_TTL:
+        _indexes.move_to_end(user_id)
+        return index
+
+    lock = _loading.setdefault(user_id, asyncio.Lock())
+    async with lock:
+        index = _indexes.get(user_id)
+        if index is None or time.monotonic() - index.loaded_at >= settings.SUGGESTIONS_INDEX_TTL:
+            index = SuggestionIndex()
+            for name, tag_id, subtag_id, weight, last_used in await get_name_usage(
+                db, user_id, settings.SUGGESTIONS_HALF_LIFE_DAYS
+            ):
+                index.add(name, (tag_id, subtag_id), last_used, weight)
+            _indexes[user_id] = index
+            while len(_indexes) > settings.SUGGESTIONS_MAX_USERS:
+                _indexes.popitem(last=False)
+    _loading.pop(user_id, None)
+    _indexes.move_to_end(user_id)
+    return index
+
+
+def record_activity(user_id: int, name: str, tag_id: int, subtag_id: Optional[int], when: datetime):
+    """Count a new activity in the user's index if this worker has it loaded"""
+    index = _indexes.get(user_id)
+    if index is not None and name:
+        index.add(name, (tag_id, subtag_id), when)
@@ -0,0 +1,66 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Dict
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import func
+
+DEFAULT_TIMEZONE = 'UTC'
+
+
+def validate_timezone(name: str) -> str:
+    try:
+        ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone '{name}'")
+    return name
+
+
+def to_local(value: datetime, timezone: str) -> datetime:
+    """Naive UTC datetime -> naive wall-clock time in timezone"""
+    return value.replace(tzinfo=dt_timezone.utc).astimezone(ZoneInfo(timezone)).replace(tzinfo=None)
+
+
+def to_utc(value: datetime, timezone: str) -> datetime:
+    """Naive wall-clock time in timezone -> naive UTC datetime"""
+    return value.replace(tzinfo=ZoneInfo(timezone)).astimezone(dt_timezone.utc).replace(tzinfo=None)
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Aware datetime -> naive UTC datetime, naive datetimes are taken as UTC already"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(dt_timezone.utc).replace(tzinfo=None)
+
+
+def epoch_seconds(value: datetime) -> float:
+    """Naive UTC datetime -> seconds since the epoch with microseconds, as the
+    auth service puts them in iat and revoked_before"""
+    return round((value - datetime(1970, 1, 1)).total_seconds(), 6)
+
+
+def local_time(column, timezone: str):
+    """SQL for the wall-clock time in timezone of a naive UTC timestamp column,
+    i.e. `column AT TIME ZONE 'UTC' AT TIME ZONE timezone`"""
+    return func.timezone(timezone, func.timezone('UTC', column))
+
+
+def utc_now():
+    """SQL for the current time as a naive UTC timestamp"""
+    return func.timezone('UTC', func.now())
+
+
+def split_by_local_day(start: datetime, end: datetime, timezone: str) -> Dict[date, float]:
+    """Minutes of the naive UTC span [start, end) that fall on each local day"""
+    local_start = to_local(start, timezone)
+    local_end = to_local(end, timezone)
+    minutes = {}
+    day_start = local_start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day_start < local_end:
+        next_day = day_start + timedelta(days=1)
+        # Elapsed time is measured in UTC so DST days count their real length
+        low = start if local_start >= day_start else to_utc(day_start, timezone)
+        high = end if local_end <= next_day else to_utc(next_day, timezone)
+        if high > low:
+            minutes[day_start.date()] = (high - low).total_seconds() / 60
+        day_start = next_day
+    return minutes
@@ -23,7 +23,7 @@ if config.config_file_name is not None:
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
-from app.db.models import (tags, subtags, tag_types, activities)
+from app.db.models import (tags, subtags, tag_types, activities, user_settings, daily_totals, tag_metrics, goals, report_jobs, user_data_versions, token_revocations)
 
 target_metadata = tags.Base.metadata
 
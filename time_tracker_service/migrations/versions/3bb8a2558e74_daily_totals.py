@@ -0,0 +1,61 @@
+"""Daily totals
+
+Revision ID: 3bb8a2558e74
+Revises: 6cc023f084e7
+Create Date: 2026-10-19 11:03:54.918272
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3bb8a2558e74'
+down_revision: Union[str, None] = '6cc023f084e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_totals',
+    sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.Column('minutes', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'day', 'tag_id')
+    )
+    # Backfill from existing closed activities
+    op.execute("""
+        INSERT INTO daily_totals (user_id, day, tag_id, minutes)
+        SELECT user_id, day, tag_id, minutes
+        FROM (
+            SELECT a.user_id, CAST(d.day AS date) AS day, a.tag_id,
+                   sum(extract(epoch FROM
+                       least(a."end", timezone('UTC', timezone(s.tz, d.day + interval '1 day')))
+                       - greatest(a.start, timezone('UTC', timezone(s.tz, d.day)))
+                   )) / 60 AS minutes
+            FROM activities AS a
+            CROSS JOIN LATERAL (
+                SELECT coalesce(
+                    (SELECT timezone FROM user_settings WHERE user_settings.user_id = a.user_id), 'UTC'
+                ) AS tz
+            ) AS s
+            CROSS JOIN LATERAL generate_series(
+                date_trunc('day', timezone(s.tz, timezone('UTC', a.start))),
+                timezone(s.tz, timezone('UTC', a."end")),
+                interval '1 day'
+            ) AS d(day)
+            WHERE a."end" IS NOT NULL AND a.tag_id IS NOT NULL
+            GROUP BY a.user_id, d.day, a.tag_id
+        ) AS totals
+        WHERE minutes > 0
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_totals')
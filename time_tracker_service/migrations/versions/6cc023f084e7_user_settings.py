@@ -0,0 +1,34 @@
+"""User settings
+
+Revision ID: 6cc023f084e7
+Revises: 5a9de42ef681
+Create Date: 2026-10-19 10:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6cc023f084e7'
+down_revision: Union[str, None] = '5a9de42ef681'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_settings',
+    sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('timezone', sa.String(), server_default='UTC', nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index('ix_activities_user_id_start', 'activities', ['user_id', 'start'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_activities_user_id_start', table_name='activities')
+    op.drop_table('user_settings')
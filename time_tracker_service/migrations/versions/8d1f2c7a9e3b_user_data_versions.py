@@ -0,0 +1,92 @@
+"""User data versions
+
+Revision ID: 8d1f2c7a9e3b
+Revises: df52c1e7787f
+Create Date: 2026-10-19 18:02:11.418260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d1f2c7a9e3b'
+down_revision: Union[str, None] = 'df52c1e7787f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables whose rows make up a user's data, with the expression giving the owner
+# of a changed row `r`. Subtags of a deleted tag find no owner, the tag's own
+# trigger covers them.
+VERSIONED_TABLES = [
+    ('activities', 'r.user_id'),
+    ('tags', 'r.user_id'),
+    ('tag_types', 'r.user_id'),
+    ('subtags', '(SELECT user_id FROM tags WHERE tags.id = r.tag_id)'),
+    ('goals', 'r.user_id'),
+    ('user_settings', 'r.user_id'),
+]
+
+# Statement level, so a bulk write bumps each affected user once
+BUMP_FUNCTION = """
+CREATE FUNCTION bump_user_data_versions() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    changed_rows text;
+BEGIN
+    changed_rows := CASE TG_OP
+        WHEN 'INSERT' THEN 'SELECT * FROM new_rows'
+        WHEN 'DELETE' THEN 'SELECT * FROM old_rows'
+        ELSE 'SELECT * FROM new_rows UNION ALL SELECT * FROM old_rows'
+    END;
+    EXECUTE format($sql$
+        WITH bumped AS (
+            INSERT INTO user_data_versions AS v (user_id, version, updated_at)
+            SELECT DISTINCT owner, 1, timezone('UTC', now())
+            FROM (SELECT %s AS owner FROM (%s) r) owners
+            WHERE owner IS NOT NULL
+            ON CONFLICT (user_id) DO UPDATE
+                SET version = v.version + 1, updated_at = excluded.updated_at
+            RETURNING user_id, version
+        )
+        SELECT pg_notify('user_data_version', user_id || ':' || version) FROM bumped
+    $sql$, TG_ARGV[0], changed_rows);
+    RETURN NULL;
+END
+$$
+"""
+
+TRIGGERS = [
+    ('insert', 'INSERT', 'NEW TABLE AS new_rows'),
+    ('update', 'UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+    ('delete', 'DELETE', 'OLD TABLE AS old_rows'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_data_versions',
+    sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.execute(BUMP_FUNCTION)
+    for table, owner in VERSIONED_TABLES:
+        for suffix, event, referencing in TRIGGERS:
+            op.execute(
+                f"CREATE TRIGGER {table}_data_version_{suffix} AFTER {event} ON {table} "
+                f"REFERENCING {referencing} FOR EACH STATEMENT "
+                f"EXECUTE FUNCTION bump_user_data_versions('{owner}')"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, _ in VERSIONED_TABLES:
+        for suffix, _, _ in TRIGGERS:
+            op.execute(f"DROP TRIGGER {table}_data_version_{suffix} ON {table}")
+    op.execute("DROP FUNCTION bump_user_data_versions()")
+    op.drop_table('user_data_versions')
@@ -0,0 +1,34 @@
+"""Token revocations
+
+Revision ID: b7e4a1d06c52
+Revises: 8d1f2c7a9e3b
+Create Date: 2026-10-19 19:12:40.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4a1d06c52'
+down_revision: Union[str, None] = '8d1f2c7a9e3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('token_revocations',
+    sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('revoked_before', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index(op.f('ix_token_revocations_revoked_before'), 'token_revocations', ['revoked_before'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_token_revocations_revoked_before'), table_name='token_revocations')
+    op.drop_table('token_revocations')
@@ -0,0 +1,32 @@
+"""Activity time range index
+
+Revision ID: c33b05fb20f5
+Revises: e5b85dfc9dc7
+Create Date: 2026-10-19 16:05:12.671093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c33b05fb20f5'
+down_revision: Union[str, None] = 'e5b85dfc9dc7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # btree_gist puts the plain user_id column into the same GiST index
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(
+        "CREATE INDEX ix_activities_user_id_range ON activities USING gist "
+        "(user_id, tsrange(start, coalesce(\"end\", 'infinity'::timestamp)))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_activities_user_id_range', table_name='activities')
@@ -0,0 +1,51 @@
+"""Cascade deletes
+
+Revision ID: df52c1e7787f
+Revises: c33b05fb20f5
+Create Date: 2026-10-19 16:48:20.530377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'df52c1e7787f'
+down_revision: Union[str, None] = 'c33b05fb20f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, referred table) of the foreign keys that get ON DELETE CASCADE
+FOREIGN_KEYS = [
+    ('activities', 'tag_id', 'tags'),
+    ('activities', 'subtag_id', 'subtags'),
+    ('subtags', 'tag_id', 'tags'),
+    ('tags', 'tag_type', 'tag_types'),
+]
+
+
+def _recreate_foreign_keys(ondelete) -> None:
+    for table, column, referred in FOREIGN_KEYS:
+        name = f'{table}_{column}_fkey'
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Cascades look rows up by these columns, without indexes every deleted
+    # tag or subtag would scan activities
+    op.create_index(op.f('ix_activities_tag_id'), 'activities', ['tag_id'], unique=False)
+    op.create_index(op.f('ix_activities_subtag_id'), 'activities', ['subtag_id'], unique=False)
+    _recreate_foreign_keys('CASCADE')
+    op.add_column('report_jobs', sa.Column('progress', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('report_jobs', 'progress')
+    _recreate_foreign_keys(None)
+    op.drop_index(op.f('ix_activities_subtag_id'), table_name='activities')
+    op.drop_index(op.f('ix_activities_tag_id'), table_name='activities')
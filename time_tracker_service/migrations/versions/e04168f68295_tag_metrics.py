@@ -0,0 +1,53 @@
+"""Tag metrics
+
+Revision ID: e04168f68295
+Revises: 3bb8a2558e74
+Create Date: 2026-10-19 12:26:07.551930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e04168f68295'
+down_revision: Union[str, None] = '3bb8a2558e74'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tag_metrics',
+    sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.Column('streak_start', sa.Date(), nullable=False),
+    sa.Column('streak_end', sa.Date(), nullable=False),
+    sa.Column('longest_streak', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'tag_id')
+    )
+    # Backfill from the daily rollup
+    op.execute("""
+        INSERT INTO tag_metrics (user_id, tag_id, streak_start, streak_end, longest_streak)
+        SELECT DISTINCT ON (user_id, tag_id) user_id, tag_id, streak_start, streak_end, longest_streak
+        FROM (
+            SELECT user_id, tag_id, min(day) AS streak_start, max(day) AS streak_end,
+                   max(count(*)) OVER (PARTITION BY user_id, tag_id) AS longest_streak
+            FROM (
+                SELECT user_id, tag_id, day,
+                       day - CAST(row_number() OVER (PARTITION BY user_id, tag_id ORDER BY day) AS integer) AS island
+                FROM daily_totals
+                WHERE minutes > 0
+            ) AS days
+            GROUP BY user_id, tag_id, island
+        ) AS islands
+        ORDER BY user_id, tag_id, streak_end DESC
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('tag_metrics')
@@ -0,0 +1,32 @@
+"""Activity search index
+
+Revision ID: e5b85dfc9dc7
+Revises: 4bfbd042fff5
+Create Date: 2026-10-19 15:20:33.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b85dfc9dc7'
+down_revision: Union[str, None] = '4bfbd042fff5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # btree_gin puts the plain user_id column into the same GIN index
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    op.execute(
+        "CREATE INDEX ix_activities_search ON activities USING gin "
+        "(user_id, to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, '')))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_activities_search', table_name='activities')
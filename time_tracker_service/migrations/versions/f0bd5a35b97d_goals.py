@@ -0,0 +1,44 @@
+"""Goals
+
+Revision ID: f0bd5a35b97d
+Revises: e04168f68295
+Create Date: 2026-10-19 13:02:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f0bd5a35b97d'
+down_revision: Union[str, None] = 'e04168f68295'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('goals',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('tag_id', sa.Integer(), nullable=True),
+    sa.Column('tag_type_id', sa.Integer(), nullable=True),
+    sa.Column('period', sa.String(), nullable=False),
+    sa.Column('target_minutes', sa.Float(), nullable=False),
+    sa.CheckConstraint('(tag_id IS NULL) <> (tag_type_id IS NULL)', name='ck_goals_tag_or_tag_type'),
+    sa.CheckConstraint("period IN ('day', 'week')", name='ck_goals_period'),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tag_type_id'], ['tag_types.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_goals_id'), 'goals', ['id'], unique=False)
+    op.create_index(op.f('ix_goals_user_id'), 'goals', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_goals_user_id'), table_name='goals')
+    op.drop_index(op.f('ix_goals_id'), table_name='goals')
+    op.drop_table('goals')
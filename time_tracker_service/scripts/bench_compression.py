@@ -0,0 +1,68 @@
+"""CPU cost of response compression against the bytes it saves.
+
+    python -m scripts.bench_compression --rows 50 500 5000
+
+No server or database needed: activity lists (JSON and columnar) of the given
+sizes are serialised the way the endpoints do it, then compressed with every
+available coding at a few levels. zstd and br only show up when the optional
+`zstandard` and `brotli` packages are installed.
+"""
+import argparse
+import time
+import zlib
+from typing import List
+
+from app.schemas.activities import ActivityResponse
+from app.utils.columnar import columnar_response
+from app.utils.compression import _BrotliStream, brotli, compress, zstandard
+from app.utils.responses import model_response
+from scripts.bench_serialization import make_activities
+
+
+def encoders() -> list:
+    candidates = [(f"gzip-{level}", lambda level=level: zlib.compressobj(level, zlib.DEFLATED, 31)) for level in (1, 6, 9)]
+    if brotli is not None:
+        candidates += [(f"br-{quality}", lambda quality=quality: _BrotliStream(quality)) for quality in (1, 4, 9)]
+    if zstandard is not None:
+        candidates += [
+            (f"zstd-{level}", lambda level=level: zstandard.ZstdCompressor(level=level).compressobj())
+            for level in (1, 3, 9)
+        ]
+    return candidates
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        activities = make_activities(rows)
+        bodies = [
+            ("json", model_response(List[ActivityResponse], activities).body),
+            ("columnar", columnar_response(activities).body),
+        ]
+        for title, body in bodies:
+            print(f"{rows} activities, {title}, {len(body) / 1024:.1f} KiB")
+            for name, factory in encoders():
+                size = len(compress(factory, body))
+                cost = best_of(args.repeat, lambda: compress(factory, body))
+                saved = (len(body) - size) / 1024
+                print(
+                    f"  {name:<8} {size / 1024:8.1f} KiB ({size / len(body):5.1%}) "
+                    f"{cost:8.3f}ms  {saved / cost if cost else 0:8.1f} KiB saved per ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Hour-of-week matrix over a year of dense data.
+
+    python -m scripts.bench_hour_of_week --user-id 900001
+
+Seeds a year of activities (one every --step-minutes) for a throwaway user,
+times get_hour_of_week_matrix over the whole year and drops the data again
+unless --keep is given.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from app.db.crud.activities import get_hour_of_week_matrix
+from app.db.db_vitals import async_session
+from scripts.seed_activities import drop_user, seed_user
+
+
+async def run(args):
+    end = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=365)
+    count = await seed_user(args.user_id, start, 365, args.step_minutes)
+    print(f"seeded {count} activities")
+
+    try:
+        timings = []
+        for _ in range(args.repeat):
+            async with async_session() as db:
+                started = time.perf_counter()
+                result = await get_hour_of_week_matrix(db, args.user_id, start, end)
+                timings.append(time.perf_counter() - started)
+        cells = sum(1 for tag in result['tags'] for row in tag['minutes'] for minutes in row if minutes)
+        print(
+            f"{len(result['tags'])} tags, {cells} non-empty cells, "
+            f"median {statistics.median(timings) * 1000:.1f}ms, "
+            f"min {min(timings) * 1000:.1f}ms, max {max(timings) * 1000:.1f}ms"
+        )
+    finally:
+        if not args.keep:
+            await drop_user(args.user_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user-id", type=int, default=900001)
+    parser.add_argument("--step-minutes", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--keep", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Activity search latency at a million rows.
+
+    python -m scripts.bench_search --user-id 900001
+
+Seeds --days of activities, one per --step-minutes (the defaults give about a
+million rows), then times search_activities for a few queries: the first page
+and the page reached after following --pages cursors. Runs EXPLAIN for the
+first query so the plan can be checked to use ix_activities_search. The data is
+dropped again unless --keep is given, --no-seed reuses kept data.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from app.db.crud.activities import search_activities, search_terms
+from app.db.db_vitals import async_session
+from app.db.models.activities import SEARCH_DOCUMENT
+from scripts.seed_activities import drop_user, seed_user
+
+QUERIES = ["review", "deep work", "plan", "synthetic activity 4242", "nonexistentword"]
+
+
+async def timed(coro):
+    started = time.perf_counter()
+    result = await coro
+    return result, time.perf_counter() - started
+
+
+async def run(args):
+    if not args.no_seed:
+        start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=args.days)
+        count = await seed_user(args.user_id, start, args.days, args.step_minutes, duration_minutes=args.step_minutes)
+        print(f"seeded {count} activities")
+
+    try:
+        async with async_session() as db:
+            await db.execute(text("ANALYZE activities"))
+            plan = await db.execute(
+                text(f"EXPLAIN SELECT id FROM activities WHERE user_id = :user_id "
+                     f"AND {SEARCH_DOCUMENT} @@ to_tsquery('simple', :query)"),
+                {'user_id': args.user_id, 'query': search_terms(QUERIES[0])}
+            )
+            print("\n".join(row[0] for row in plan.all()))
+
+        for query in QUERIES:
+            first, deep = [], []
+            for _ in range(args.repeat):
+                async with async_session() as db:
+                    (rows, cursor), elapsed = await timed(search_activities(db, args.user_id, query, args.limit))
+                    first.append(elapsed)
+                    for _ in range(args.pages):
+                        if cursor is None:
+                            break
+                        (rows, cursor), elapsed = await timed(
+                            search_activities(db, args.user_id, query, args.limit, cursor)
+                        )
+                    else:
+                        deep.append(elapsed)
+            line = f"{query!r:<28} first page median {statistics.median(first) * 1000:8.1f}ms"
+            if deep:
+                line += f", page {args.pages + 1} median {statistics.median(deep) * 1000:8.1f}ms"
+            print(line)
+    finally:
+        if not args.keep:
+            await drop_user(args.user_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user-id", type=int, default=900001)
+    parser.add_argument("--days", type=int, default=700)
+    parser.add_argument("--step-minutes", type=int, default=1)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=10, help="cursors to follow for the deep page timing")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true")
+    parser.add_argument("--no-seed", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
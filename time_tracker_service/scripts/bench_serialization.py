@@ -0,0 +1,94 @@
+"""Serialisation cost of the list endpoints, FastAPI's response_model path
+against model_response, and of the columnar activity format.
+
+    python -m scripts.bench_serialization --rows 1000
+
+No server or database needed: unsaved ORM objects are serialised the way each
+endpoint does it, the query itself is not measured.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.db.models import Activity, Tag, TagType
+from app.schemas.activities import ActivityResponse
+from app.schemas.tag_types import TagTypeResponse
+from app.schemas.tags import TagResponse
+from app.utils.columnar import columnar_response
+from app.utils.responses import model_response
+
+
+def make_activities(rows: int) -> list:
+    start = datetime(2024, 1, 1)
+    return [
+        Activity(
+            id=index, user_id=1, tag_id=index % 8, subtag_id=index % 3 or None,
+            name=f"activity {index % 50}", description=f"synthetic activity number {index}",
+            start=start + timedelta(minutes=30 * index),
+            end=start + timedelta(minutes=30 * index + 25)
+        )
+        for index in range(rows)
+    ]
+
+
+def make_tags(rows: int) -> list:
+    return [Tag(id=index, user_id=1, name=f"tag {index}", color="#888888", tag_type=index % 4) for index in range(rows)]
+
+
+def make_tag_types(rows: int) -> list:
+    return [TagType(id=index, user_id=1, name=f"type {index}") for index in range(rows)]
+
+
+ENDPOINTS = [
+    ("GET /activities, /activities/range", List[ActivityResponse], make_activities),
+    ("GET /tags", List[TagResponse], make_tags),
+    ("GET /tag-types", List[TagTypeResponse], make_tag_types),
+]
+
+
+async def fastapi_path(field, content) -> bytes:
+    serialized = await serialize_response(field=field, response_content=content)
+    return JSONResponse(serialized).body
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    for title, response_type, make in ENDPOINTS:
+        content = make(args.rows)
+        field = create_model_field(name="Response", type_=response_type, mode="serialization")
+        baseline = best_of(args.repeat, lambda: loop.run_until_complete(fastapi_path(field, content)))
+        fast = best_of(args.repeat, lambda: model_response(response_type, content).body)
+        size = len(model_response(response_type, content).body)
+        print(
+            f"{title:<38} {args.rows} rows, {size / 1024:8.1f} KiB: "
+            f"response_model {baseline:7.2f}ms, model_response {fast:7.2f}ms, x{baseline / fast:.1f}"
+        )
+
+    activities = make_activities(args.rows)
+    columnar = best_of(args.repeat, lambda: columnar_response(activities).body)
+    size = len(columnar_response(activities).body)
+    print(f"{'activities, columnar':<38} {args.rows} rows, {size / 1024:8.1f} KiB: {columnar:7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Latency of cheap requests while large stats requests run on the same server.
+
+Start the service, then run from the service directory:
+
+    python -m scripts.bench_stats_latency --user-id 1 --activity-id 42 \\
+        --start 2024-01-01T00:00:00 --end 2025-01-01T00:00:00
+
+The script first measures `GET /activities/{id}` alone, then again while
+`--large-concurrency` clients keep requesting `/activities/stats` over the given
+range, and prints p50/p95/p99 for both phases. Run it once with the server's
+STATS_PROCESS_POOL_THRESHOLD set very high (inline aggregation) and once with the
+default to compare.
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from jose import jwt
+
+from app.config.settings import settings
+
+
+def make_token(user_id: int) -> str:
+    return jwt.encode(
+        {"sub": str(user_id), "type": "access", "exp": datetime.utcnow() + timedelta(hours=1)},
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM
+    )
+
+
+def request(url: str, token: str, body: dict = None) -> float:
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(
+        url,
+        data=data,
+        method="GET",
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    )
+    started = time.perf_counter()
+    with urllib.request.urlopen(req) as response:
+        response.read()
+    return time.perf_counter() - started
+
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+def measure_small(args, token: str) -> list:
+    url = f"{args.base_url}/activities/{args.activity_id}"
+    samples = []
+    deadline = time.monotonic() + args.duration
+    while time.monotonic() < deadline:
+        samples.append(request(url, token))
+        time.sleep(args.interval)
+    return samples
+
+
+def report(title: str, samples: list):
+    print(
+        f"{title:<24} n={len(samples):<6} "
+        f"p50={percentile(samples, 0.50):8.1f}ms "
+        f"p95={percentile(samples, 0.95):8.1f}ms "
+        f"p99={percentile(samples, 0.99):8.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8002")
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--activity-id", type=int, required=True)
+    parser.add_argument("--start", required=True, help="stats range start, ISO format")
+    parser.add_argument("--end", required=True, help="stats range end, ISO format")
+    parser.add_argument("--large-concurrency", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per phase")
+    parser.add_argument("--interval", type=float, default=0.01, help="pause between small requests")
+    args = parser.parse_args()
+
+    token = make_token(args.user_id)
+    report("idle", measure_small(args, token))
+
+    stop = threading.Event()
+    stats_url = f"{args.base_url}/activities/stats"
+    stats_body = {"start": args.start, "end": args.end}
+    large_samples = []
+
+    def hammer():
+        while not stop.is_set():
+            large_samples.append(request(stats_url, token, stats_body))
+
+    with ThreadPoolExecutor(max_workers=args.large_concurrency) as pool:
+        for _ in range(args.large_concurrency):
+            pool.submit(hammer)
+        report("under stats load", measure_small(args, token))
+        stop.set()
+
+    if large_samples:
+        report("stats requests", large_samples)
+
+
+if __name__ == "__main__":
+    main()
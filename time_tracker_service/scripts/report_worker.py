@@ -0,0 +1,37 @@
+"""Standalone report worker for REPORT_QUEUE_BACKEND=database.
+
+Run from the service directory, as many processes as the box allows:
+
+    REPORT_QUEUE_BACKEND=database python -m scripts.report_worker --workers 2
+
+Workers claim jobs from the report_jobs table with SKIP LOCKED, so they can run
+next to API processes started with REPORT_WORKERS=0. REPORTS_DIR has to be the
+same directory for the workers and the API.
+"""
+import argparse
+import asyncio
+
+from app.config.settings import settings
+from app.utils.jobs import start_report_workers, stop_report_workers
+
+
+async def run(workers: int):
+    await start_report_workers(workers)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await stop_report_workers()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=settings.REPORT_WORKERS)
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Synthetic activity history for benchmarks.
+
+    python -m scripts.seed_activities --user-id 900001 --days 365 --step-minutes 30
+    python -m scripts.seed_activities --user-id 900001 --drop
+
+Rows are generated server side with generate_series, so seeding a million
+activities takes seconds. Use a user id no real account has: --drop removes
+everything that user owns.
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from app.db.crud.daily_totals import rebuild_daily_totals
+from app.db.db_vitals import async_session
+
+WORDS = [
+    "review", "planning", "deep work", "email", "meeting", "reading", "writing",
+    "refactoring", "gym", "commute", "design", "interview", "support", "research",
+]
+
+
+async def seed_user(
+    user_id: int,
+    start: datetime,
+    days: int,
+    step_minutes: int = 30,
+    duration_minutes: int = 25,
+    tag_count: int = 8
+) -> int:
+    """Insert one activity every step_minutes over days, returns the row count"""
+    async with async_session() as db:
+        tag_type_id = (await db.execute(
+            text("INSERT INTO tag_types (user_id, name) VALUES (:user_id, 'bench') RETURNING id"),
+            {'user_id': user_id}
+        )).scalar_one()
+        tag_ids = [
+            (await db.execute(
+                text("INSERT INTO tags (user_id, name, color, tag_type) "
+                     "VALUES (:user_id, :name, '#888888', :tag_type) RETURNING id"),
+                {'user_id': user_id, 'name': f'bench-{index}', 'tag_type': tag_type_id}
+            )).scalar_one()
+            for index in range(tag_count)
+        ]
+        result = await db.execute(
+            text("""
+                INSERT INTO activities (user_id, tag_id, name, description, start, "end")
+                SELECT :user_id,
+                       (CAST(:tag_ids AS integer[]))[1 + n % :tag_count],
+                       (CAST(:words AS text[]))[1 + n % :word_count] || ' ' || (n % 97),
+                       'synthetic activity ' || n || ' about ' || (CAST(:words AS text[]))[1 + (n / 7) % :word_count],
+                       slot,
+                       slot + make_interval(mins => :duration_minutes)
+                FROM generate_series(
+                    CAST(:start AS timestamp),
+                    CAST(:end AS timestamp),
+                    make_interval(mins => :step_minutes)
+                ) WITH ORDINALITY AS slots(slot, n)
+            """),
+            {
+                'user_id': user_id,
+                'tag_ids': tag_ids,
+                'tag_count': len(tag_ids),
+                'words': WORDS,
+                'word_count': len(WORDS),
+                'duration_minutes': duration_minutes,
+                'step_minutes': step_minutes,
+                'start': start,
+                'end': start + timedelta(days=days),
+            }
+        )
+        await rebuild_daily_totals(db, user_id)
+        await db.commit()
+        return result.rowcount
+
+
+async def drop_user(user_id: int) -> None:
+    async with async_session() as db:
+        for table in ("daily_totals", "activities"):
+            await db.execute(text(f"DELETE FROM {table} WHERE user_id = :user_id"), {'user_id': user_id})
+        await db.execute(
+            text("DELETE FROM subtags WHERE tag_id IN (SELECT id FROM tags WHERE user_id = :user_id)"),
+            {'user_id': user_id}
+        )
+        for table in ("tags", "tag_types", "user_settings"):
+            await db.execute(text(f"DELETE FROM {table} WHERE user_id = :user_id"), {'user_id': user_id})
+        await db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--step-minutes", type=int, default=30)
+    parser.add_argument("--drop", action="store_true", help="delete the user's data instead of seeding")
+    args = parser.parse_args()
+
+    if args.drop:
+        asyncio.run(drop_user(args.user_id))
+        print(f"dropped user {args.user_id}")
+        return
+
+    start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=args.days)
+    count = asyncio.run(seed_user(args.user_id, start, args.days, args.step_minutes))
+    print(f"seeded {count} activities for user {args.user_id}")
+
+
+if __name__ == "__main__":
+    main()
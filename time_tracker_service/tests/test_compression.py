@@ -0,0 +1,95 @@
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+from app.utils import compression
+from app.utils.compression import CompressionMiddleware, available_encoders, compression_metrics, negotiate
+
+BODY = b'{"items":"' + b"a" * 4096 + b'"}'
+ALL_CODINGS = ["zstd", "br", "gzip"]
+
+
+def make_client(minimum_size: int = 1024) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+
+    @app.get("/large")
+    async def large(fill: str = Query("a")):
+        return Response(BODY.replace(b"a", fill.encode()), media_type="application/json", headers={"ETag": '"large"'})
+
+    @app.get("/small")
+    async def small():
+        return Response(b'{"ok":true}', media_type="application/json")
+
+    @app.get("/unchanged")
+    async def unchanged():
+        raise HTTPException(status_code=304, headers={"ETag": '"large"'})
+
+    return TestClient(app)
+
+
+def test_negotiate_prefers_quality_then_server_order():
+    assert negotiate("gzip;q=0.5, br;q=0.8", ALL_CODINGS) == "br"
+    assert negotiate("gzip, br", ALL_CODINGS) == "br"
+    assert negotiate("*", ALL_CODINGS) == "zstd"
+    assert negotiate("*;q=0.1, gzip", ALL_CODINGS) == "gzip"
+    assert negotiate("GZIP; Q=0.3", ALL_CODINGS) == "gzip"
+    assert negotiate("", ALL_CODINGS) is None
+
+
+def test_negotiate_zero_quality():
+    assert negotiate("gzip;q=0, identity", ["gzip"]) is None
+    assert negotiate("*;q=0", ALL_CODINGS) is None
+    # Refusing identity does not stop compression, nor invent a coding
+    assert negotiate("identity;q=0, gzip", ALL_CODINGS) == "gzip"
+    assert negotiate("identity;q=0", ALL_CODINGS) is None
+    assert negotiate("br;q=bogus, gzip;q=0.1", ALL_CODINGS) == "gzip"
+
+
+def test_without_optional_libraries_only_gzip_is_offered(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    monkeypatch.setattr(compression, "zstandard", None)
+    encoders = available_encoders()
+    assert list(encoders) == ["gzip"]
+    assert negotiate("zstd, br, gzip;q=0.5", encoders) == "gzip"
+    assert negotiate("zstd, br", encoders) is None
+
+
+def test_large_response_is_gzipped_with_weak_etag():
+    response = make_client().get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.headers["etag"] == 'W/"large"'
+    assert response.content == BODY
+
+
+def test_not_modified_varies_on_accept_encoding():
+    client = make_client()
+    encoded = client.get("/unchanged", headers={"Accept-Encoding": "gzip"})
+    assert encoded.status_code == 304
+    assert encoded.headers["etag"] == 'W/"large"'
+    assert "Accept-Encoding" in encoded.headers["vary"]
+    plain = client.get("/unchanged", headers={"Accept-Encoding": "identity"})
+    assert plain.headers["etag"] == '"large"'
+    assert "Accept-Encoding" in plain.headers["vary"]
+
+
+def test_cache_tells_bodies_under_one_etag_apart():
+    client = make_client()
+    hits = compression_metrics()["cache_hits"]
+    first = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    other = client.get("/large?fill=b", headers={"Accept-Encoding": "gzip"})
+    again = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert compression_metrics()["cache_hits"] == hits + 1
+    assert first.content == again.content == BODY
+    assert other.content == BODY.replace(b"a", b"b")
+
+
+def test_small_and_unaccepted_responses_are_not_compressed():
+    client = make_client()
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    response = client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"large"'
+    assert response.content == BODY
@@ -0,0 +1,39 @@
+from datetime import datetime
+
+import pytest
+
+from app.utils.stats import bucket_window, parse_granularity
+
+
+def test_parse_granularity():
+    assert parse_granularity(" Week ") == "week"
+    assert parse_granularity("07d") == "7d"
+    with pytest.raises(ValueError):
+        parse_granularity("0d")
+
+
+def test_n_day_window_covers_whole_buckets_from_start_day():
+    # 03-03 to 03-09 touches 7 days, rounded up to three 3-day buckets
+    assert bucket_window("3d", datetime(2025, 3, 3, 15, 0), datetime(2025, 3, 9, 10, 0)) == (
+        datetime(2025, 3, 3), datetime(2025, 3, 12)
+    )
+    assert bucket_window("7d", datetime(2025, 3, 3, 15, 0), datetime(2025, 3, 9, 23, 0)) == (
+        datetime(2025, 3, 3), datetime(2025, 3, 10)
+    )
+
+
+def test_named_windows_align_to_calendar():
+    # Wednesday to Sunday is one ISO week
+    assert bucket_window("week", datetime(2025, 3, 5, 8, 0), datetime(2025, 3, 9, 20, 0)) == (
+        datetime(2025, 3, 3), datetime(2025, 3, 10)
+    )
+    assert bucket_window("month", datetime(2024, 12, 15), datetime(2024, 12, 31, 23, 0)) == (
+        datetime(2024, 12, 1), datetime(2025, 1, 1)
+    )
+
+
+def test_window_over_dst_change_is_in_wall_clock_time():
+    # Local times from to_local, the short day still counts as one bucket
+    assert bucket_window("day", datetime(2025, 3, 30, 1, 30), datetime(2025, 3, 30, 23, 0)) == (
+        datetime(2025, 3, 30), datetime(2025, 3, 31)
+    )
@@ -0,0 +1,38 @@
+from datetime import date, datetime
+
+from app.utils.timezones import split_by_local_day, to_local, to_utc
+
+BERLIN = "Europe/Berlin"
+
+
+def test_conversions_across_spring_forward():
+    # 2025-03-30 02:00 CET jumps to 03:00 CEST, at 01:00 UTC
+    assert to_local(datetime(2025, 3, 30, 0, 59), BERLIN) == datetime(2025, 3, 30, 1, 59)
+    assert to_local(datetime(2025, 3, 30, 1, 0), BERLIN) == datetime(2025, 3, 30, 3, 0)
+    assert to_utc(datetime(2025, 3, 30, 3, 0), BERLIN) == datetime(2025, 3, 30, 1, 0)
+
+
+def test_ambiguous_wall_clock_time_takes_the_first_occurrence():
+    # 02:30 happens twice on 2025-10-26, first in CEST
+    assert to_utc(datetime(2025, 10, 26, 2, 30), BERLIN) == datetime(2025, 10, 26, 0, 30)
+
+
+def test_split_counts_real_length_of_dst_days():
+    short_day = split_by_local_day(datetime(2025, 3, 29, 23, 0), datetime(2025, 3, 30, 22, 0), BERLIN)
+    assert short_day == {date(2025, 3, 30): 23 * 60}
+    long_day = split_by_local_day(datetime(2025, 10, 25, 22, 0), datetime(2025, 10, 26, 23, 0), BERLIN)
+    assert long_day == {date(2025, 10, 26): 25 * 60}
+
+
+def test_split_of_span_crossing_local_midnight():
+    # 21:30-23:30 UTC is 23:30-01:30 in Berlin summer time
+    minutes = split_by_local_day(datetime(2025, 6, 1, 21, 30), datetime(2025, 6, 1, 23, 30), BERLIN)
+    assert minutes == {date(2025, 6, 1): 30, date(2025, 6, 2): 90}
+    # The same span stays on one day in UTC
+    assert split_by_local_day(datetime(2025, 6, 1, 21, 30), datetime(2025, 6, 1, 23, 30), "UTC") == {
+        date(2025, 6, 1): 120
+    }
+
+
+def test_split_of_empty_span():
+    assert split_by_local_day(datetime(2025, 6, 1, 12), datetime(2025, 6, 1, 12), BERLIN) == {}